@@ -1,8 +1,8 @@
 """
 Doubao Seedance 2.0 - Text/image-to-video model
 """
-import time
 from .modelverse_api.client import ModelverseClient
+from .modelverse_api.polling import poll_task
 from .modelverse_api.requests.doubao_seedance_2 import (
     DoubaoSeedance2,
     MODEL,
@@ -99,7 +99,7 @@ class DoubaoSeedance2Node:
             draft=draft,
         )
 
-        mv_client = ModelverseClient(api_key)
+        mv_client = ModelverseClient.from_client(client)
         print(f"Submitting Seedance 2.0 task: model={MODEL}, prompt={prompt!r}")
         submit_res = mv_client.submit_task_request(request)
         task_id = submit_res.get("output", {}).get("task_id")
@@ -111,25 +111,7 @@ class DoubaoSeedance2Node:
         return (video_url, task_id)
 
     def _poll_task(self, mv_client, task_id, max_retries=180):
-        for i in range(max_retries):
-            status_res = mv_client.get_task_status(task_id)
-            task_status = status_res.get("output", {}).get("task_status")
-
-            if task_status == "Success":
-                urls = status_res.get("output", {}).get("urls", [])
-                if urls:
-                    return urls[0]
-                raise Exception("Task succeeded but no video URL returned")
-            if task_status == "Failure":
-                error = status_res.get("output", {}).get("error_message", "Unknown error")
-                raise Exception(f"Task failed: {error}")
-            if task_status in ["Pending", "Running"]:
-                print(f"Task {task_id}: {task_status} ({i + 1}/{max_retries})")
-                time.sleep(5)
-                continue
-            raise Exception(f"Unknown status: {task_status}")
-
-        raise Exception("Task timed out")
+        return poll_task(mv_client, task_id, max_retries=max_retries)
 
 
 NODE_CLASS_MAPPINGS = {
@@ -1,4 +1,6 @@
-from .modelverse_api.utils import imageurl2tensor
+from functools import partial
+from .modelverse_api.utils import encode_images, image_to_base64, image_results_outputs, output_connected, request_seed
+from .modelverse_api.progress import ResultPreviewer
 from .modelverse_api.client import ModelverseClient
 from .modelverse_api.requests.flux_kontext_pro import FluxKontextPro, FluxKontextProMulti
 import torch
@@ -51,10 +53,21 @@ class FluxKontextProNode:
                     "tooltip": "Guidance scale for generation (0.0 to 10.0)"
                 }),
             },
+            "optional": {
+                "download_images": (IO.BOOLEAN, {
+                    "default": True,
+                    "tooltip": "Download the generated images for the image output. Turn off when only the urls outputs are used; image then returns an empty placeholder."
+                }),
+            },
+            "hidden": {
+                "graph": "PROMPT",
+                "unique_id": "UNIQUE_ID",
+            },
         }
 
-    RETURN_TYPES = ("IMAGE", )
-    RETURN_NAMES = ("image",)
+    RETURN_TYPES = ("IMAGE", "STRING", "STRING")
+    RETURN_NAMES = ("image", "urls", "url_lines")
+    OUTPUT_IS_LIST = (False, True, False)
 
     CATEGORY = "UCLOUD_MODELVERSE/Flux"
     FUNCTION = "execute"
@@ -65,7 +78,10 @@ class FluxKontextProNode:
                 images,
                 num_requests=1,
                 seed=-1,
-                guidance_scale=2.5):
+                guidance_scale=2.5,
+                download_images=True,
+                graph=None,
+                unique_id=None):
 
         if prompt is None or prompt == "":
             raise ValueError("Prompt is required")
@@ -88,37 +104,44 @@ class FluxKontextProNode:
         else:
             print("INFO:", "Running Flux Kontext Pro single-image edit mode.")
 
-        client = ModelverseClient(client["api_key"])
+        client = ModelverseClient.from_client(client)
+
+        # Encode the inputs once for all requests; the multi-image set in parallel
+        if mode == "multi":
+            images = encode_images(images, "black-forest-labs/flux-kontext-pro/multi")
+        elif isinstance(images, torch.Tensor):
+            images = image_to_base64(images, "black-forest-labs/flux-kontext-pro")
 
         if mode == "multi":
-            tasks = [client.async_send_request(FluxKontextProMulti(
+            tasks = [partial(client.async_send_request, FluxKontextProMulti(
                 prompt=prompt,
                 images=images,
-                seed=seed+i,
+                seed=request_seed(seed, i),
                 guidance_scale=guidance_scale
             ))
                 for i in range(num_requests)]
         else:
-            tasks = [client.async_send_request(FluxKontextPro(
+            tasks = [partial(client.async_send_request, FluxKontextPro(
                 prompt=prompt,
                 image=images,
-                seed=seed+i,
+                seed=request_seed(seed, i),
                 guidance_scale=guidance_scale
             ))
                 for i in range(num_requests)]
 
-        image_urls = await client.run_tasks(tasks)
+        # Each request's first image is previewed on the node as it completes
+        previews = ResultPreviewer(len(tasks), enabled=output_connected(graph, unique_id))
+        image_urls = await client.run_tasks(tasks, on_result=previews)
 
-        output_images_list = []
         for image_url in image_urls:
             if not image_url:
                 print(
                     "WARN:", "No image URLs in the generated result in current request. Skipping...")
-            output_images = imageurl2tensor(image_url)
-            output_images_list.append(output_images)
         print(
-            "INFO:", f"{len(output_images_list)}/{num_requests} request made successfully.")
-        return (torch.cat(output_images_list, dim=0),)
+            "INFO:", f"{sum(1 for u in image_urls if u)}/{num_requests} request made successfully.")
+        # The urls outputs can feed video nodes directly; images are only
+        # downloaded if download_images is on
+        return await image_results_outputs(image_urls, download_images)
 
 
 NODE_CLASS_MAPPINGS = {
@@ -1,10 +1,15 @@
-from .modelverse_api.utils import imageurl2tensor
+from functools import partial
+from .modelverse_api.utils import image_results_outputs, output_connected, request_seed
+from .modelverse_api.planner import MAX_PARALLEL, TOTAL_IMAGES_TOOLTIP, describe, plan_images
+from .modelverse_api.progress import ResultPreviewer
 from .modelverse_api.client import ModelverseClient
 from .modelverse_api.requests.flux_kontext_pro import FluxKontextProT2I
-import torch
 from comfy.comfy_types.node_typing import IO
 
 
+MODEL = "black-forest-labs/flux-kontext-pro/text-to-image"
+
+
 class FluxKontextProT2INode:
     """
     Flux Image Generator Node (Kontext Pro) for text2image task.
@@ -55,10 +60,29 @@ class FluxKontextProT2INode:
                     "tooltip": "Guidance scale for generation (0.0 to 10.0)"
                 }),
             },
+            "optional": {
+                "total_images": (IO.INT, {
+                    "default": 0,
+                    "min": 0,
+                    "max": 40,
+                    "step": 1,
+                    "display": "number",
+                    "tooltip": TOTAL_IMAGES_TOOLTIP
+                }),
+                "download_images": (IO.BOOLEAN, {
+                    "default": True,
+                    "tooltip": "Download the generated images for the image output. Turn off when only the urls outputs are used; image then returns an empty placeholder."
+                }),
+            },
+            "hidden": {
+                "graph": "PROMPT",
+                "unique_id": "UNIQUE_ID",
+            },
         }
 
-    RETURN_TYPES = ("IMAGE", )
-    RETURN_NAMES = ("image",)
+    RETURN_TYPES = ("IMAGE", "STRING", "STRING")
+    RETURN_NAMES = ("image", "urls", "url_lines")
+    OUTPUT_IS_LIST = (False, True, False)
 
     CATEGORY = "UCLOUD_MODELVERSE/Flux"
     FUNCTION = "execute"
@@ -70,36 +94,49 @@ class FluxKontextProT2INode:
                 num_requests=1,
                 aspect_ratio="1:1",
                 seed=-1,
-                guidance_scale=2.5):
+                guidance_scale=2.5,
+                total_images=0,
+                download_images=True,
+                graph=None,
+                unique_id=None):
 
         if prompt is None or prompt == "":
             raise ValueError("Prompt is required")
 
         print("INFO:", "Running Flux Kontext Pro text-to-image mode.")
 
-        client = ModelverseClient(client["api_key"])
+        client = ModelverseClient.from_client(client)
+
+        # Auto mode: split total_images by measured latency per images per call
+        counts = [num_images] * num_requests
+        if total_images > 0:
+            counts = plan_images(MODEL, total_images, limiter=client.limiter)
+            print("INFO:", f"Auto mode: {total_images} image(s) as {describe(counts)}.")
+        num_requests = len(counts)
 
-        tasks = [client.async_send_request(FluxKontextProT2I(
+        tasks = [partial(client.async_send_request, FluxKontextProT2I(
             prompt=prompt,
             aspect_ratio=aspect_ratio,
-            num_images=num_images,
-            seed=seed+i,
+            num_images=counts[i],
+            seed=request_seed(seed, i),
             guidance_scale=guidance_scale
         ))
             for i in range(num_requests)]
 
-        image_urls = await client.run_tasks(tasks)
+        # Each request's first image is previewed on the node as it completes
+        previews = ResultPreviewer(len(tasks), enabled=output_connected(graph, unique_id))
+        image_urls = await client.run_tasks(tasks, on_result=previews, merge=not total_images,
+                                            max_parallel=MAX_PARALLEL if total_images else None)
 
-        output_images_list = []
         for image_url in image_urls:
             if not image_url:
                 print(
                     "WARN:", "No image URLs in the generated result in current request. Skipping...")
-            output_images = imageurl2tensor(image_url)
-            output_images_list.append(output_images)
         print(
-            "INFO:", f"{len(output_images_list)}/{num_requests} request made successfully.")
-        return (torch.cat(output_images_list, dim=0),)
+            "INFO:", f"{sum(1 for u in image_urls if u)}/{num_requests} request made successfully.")
+        # The urls outputs can feed video nodes directly; images are only
+        # downloaded if download_images is on
+        return await image_results_outputs(image_urls, download_images)
 
 
 NODE_CLASS_MAPPINGS = {
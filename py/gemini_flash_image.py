@@ -1,11 +1,11 @@
-import base64
+from functools import partial
 import torch
 from typing import Optional, List, Dict, Any
 from comfy.comfy_types.node_typing import IO
 
 from .modelverse_api.client import ModelverseClient
 from .modelverse_api.requests.gemini_flash_image import GeminiFlashImageRequest
-from .modelverse_api.utils import decode_image, images2tensor
+from .modelverse_api.utils import decode_image, images2tensor, inline_data_bytes
 
 
 MODELS = ["gemini-3.1-flash-image", "gemini-2.5-flash-image"]
@@ -25,8 +25,7 @@ def _extract_images_from_gemini_response(resp: Dict[str, Any]) -> List[torch.Ten
                     data_b64 = inline.get("data")
                     if data_b64:
                         try:
-                            img_bytes = base64.b64decode(data_b64)
-                            pil_img = decode_image(img_bytes)
+                            pil_img = decode_image(inline_data_bytes(data_b64))
                             images.append(pil_img)
                         except Exception:
                             continue
@@ -51,7 +50,7 @@ class GeminiFlashImageNode:
                 "client": ("MODELVERSE_API_CLIENT",),
                 "model": (MODELS, {"default": "gemini-3.1-flash-image", "tooltip": "Gemini Flash Image model"}),
                 "prompt": (IO.STRING, {"multiline": True, "default": "Create a picture of a nano banana dish in a fancy restaurant with a Gemini theme"}),
-                "mime_type": (["image/png", "image/jpeg"], {"default": "image/png"}),
+                "mime_type": (["auto", "image/png", "image/jpeg"], {"default": "auto", "tooltip": "Format of the input images sent inline; auto picks PNG or JPEG per image"}),
                 "num_requests": (IO.INT, {"default": 1, "min": 1, "max": 10, "step": 1, "display": "number"}),
             },
             "optional": {
@@ -68,20 +67,22 @@ class GeminiFlashImageNode:
                       client,
                       model: str,
                       prompt: str,
-                      mime_type: str = "image/png",
+                      mime_type: str = "auto",
                       num_requests: int = 1,
                       image=None):
         if not prompt:
             raise ValueError("Prompt is required")
 
-        mv_client = ModelverseClient(client["api_key"])
+        mv_client = ModelverseClient.from_client(client)
 
-        outputs: List[torch.Tensor] = []
-        for i in range(num_requests):
-            req = GeminiFlashImageRequest(prompt=prompt, model=model, image=image, mime_type=mime_type)
-            payload = req.build_payload()
-            resp = mv_client.post(req.API_PATH, payload)
+        # Build the payload once and send all requests together
+        req = GeminiFlashImageRequest(prompt=prompt, model=model, image=image, mime_type=mime_type)
+        payload = req.build_payload()
+        tasks = [partial(mv_client.async_post, req.API_PATH, payload, stream=True) for _ in range(num_requests)]
+        responses = await mv_client.run_tasks(tasks)
 
+        outputs: List[torch.Tensor] = []
+        for resp in responses:
             if isinstance(resp, dict) and resp.get("error"):
                 err = resp.get("error")
                 raise Exception(f"GeminiFlashImage error: {err.get('message', 'Unknown error')}")
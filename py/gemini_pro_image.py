@@ -6,14 +6,14 @@ Professional asset production with advanced features:
 - Google Search grounding
 - Up to 14 reference images
 """
-import base64
+from functools import partial
 import torch
 from typing import Optional, List, Dict, Any
 from comfy.comfy_types.node_typing import IO
 
 from .modelverse_api.client import ModelverseClient
 from .modelverse_api.requests.gemini_pro_image import GeminiProImageRequest
-from .modelverse_api.utils import decode_image, images2tensor
+from .modelverse_api.utils import decode_image, images2tensor, inline_data_bytes
 
 
 def _extract_images_from_gemini_response(resp: Dict[str, Any]) -> List[torch.Tensor]:
@@ -28,8 +28,7 @@ def _extract_images_from_gemini_response(resp: Dict[str, Any]) -> List[torch.Ten
             if inline:
                 data_b64 = inline.get("data")
                 if data_b64:
-                    raw = base64.b64decode(data_b64)
-                    pil_img = decode_image(raw)
+                    pil_img = decode_image(inline_data_bytes(data_b64))
                     tensors.append(images2tensor(pil_img))
             # Also print any text response
             if part.get("text"):
@@ -62,7 +61,7 @@ class GeminiProImageNode:
             "required": {
                 "client": ("MODELVERSE_API_CLIENT",),
                 "prompt": (IO.STRING, {"multiline": True, "default": "Create a professional product photo"}),
-                "mime_type": (["image/png", "image/jpeg"], {"default": "image/png"}),
+                "mime_type": (["auto", "image/png", "image/jpeg"], {"default": "auto", "tooltip": "Format of the input images sent inline; auto picks PNG or JPEG per image"}),
                 "aspect_ratio": (ASPECT_RATIOS, {"default": "auto"}),
                 "image_size": (IMAGE_SIZES, {"default": "1K"}),
                 "use_google_search": (IO.BOOLEAN, {"default": False, "tooltip": "Enable Google Search grounding for real-time info"}),
@@ -86,7 +85,7 @@ class GeminiProImageNode:
         self,
         client,
         prompt: str,
-        mime_type: str = "image/png",
+        mime_type: str = "auto",
         aspect_ratio: str = "auto",
         image_size: str = "1K",
         use_google_search: bool = False,
@@ -100,7 +99,7 @@ class GeminiProImageNode:
         if not prompt:
             raise ValueError("Prompt is required")
 
-        mv_client = ModelverseClient(client["api_key"])
+        mv_client = ModelverseClient.from_client(client)
 
         # Collect input images
         images = []
@@ -111,19 +110,22 @@ class GeminiProImageNode:
         # Process aspect_ratio
         ar = aspect_ratio if aspect_ratio != "auto" else None
 
-        outputs: List[torch.Tensor] = []
-        for i in range(num_requests):
-            req = GeminiProImageRequest(
-                prompt=prompt,
-                images=images if images else None,
-                mime_type=mime_type,
-                aspect_ratio=ar,
-                image_size=image_size,
-                use_google_search=use_google_search,
-            )
-            payload = req.build_payload()
-            resp = mv_client.post(req.API_PATH, payload)
+        # Build the payload once; the input images are encoded in parallel
+        req = GeminiProImageRequest(
+            prompt=prompt,
+            images=images if images else None,
+            mime_type=mime_type,
+            aspect_ratio=ar,
+            image_size=image_size,
+            use_google_search=use_google_search,
+        )
+        payload = req.build_payload()
+
+        tasks = [partial(mv_client.async_post, req.API_PATH, payload, stream=True) for _ in range(num_requests)]
+        responses = await mv_client.run_tasks(tasks)
 
+        outputs: List[torch.Tensor] = []
+        for resp in responses:
             if isinstance(resp, dict) and resp.get("error"):
                 err = resp.get("error")
                 raise Exception(f"GeminiProImage error: {err.get('message', 'Unknown error')}")
@@ -1,13 +1,16 @@
-import base64
-import torch
-from typing import List
+from functools import partial
 from comfy.comfy_types.node_typing import IO
 
-from .modelverse_api.utils import imageurl2tensor, decode_image, images2tensor
+from .modelverse_api.utils import image_results_outputs, output_connected
+from .modelverse_api.planner import MAX_PARALLEL, TOTAL_IMAGES_TOOLTIP, describe, plan_images
+from .modelverse_api.progress import ResultPreviewer
 from .modelverse_api.client import ModelverseClient
 from .modelverse_api.requests.gpt_image_1 import GPTImage1
 
 
+MODEL = "gpt-image-1"
+
+
 class GPTImage1Node:
     """
     gpt-image-1 text-to-image via Modelverse /v1/images/generations API.
@@ -27,11 +30,19 @@ class GPTImage1Node:
                 "quality": (["", "low", "medium", "high"], {"default": ""}),
                 "output_format": (["png", "jpeg"], {"default": "png"}),
                 "output_compression": (IO.INT, {"default": 100, "min": 0, "max": 100, "step": 1, "display": "number"}),
+                "total_images": (IO.INT, {"default": 0, "min": 0, "max": 40, "step": 1, "display": "number",
+                                          "tooltip": TOTAL_IMAGES_TOOLTIP}),
+                "download_images": (IO.BOOLEAN, {"default": True, "tooltip": "Download the generated images for the image output. Turn off when only the urls outputs are used; image then returns an empty placeholder."}),
+            },
+            "hidden": {
+                "graph": "PROMPT",
+                "unique_id": "UNIQUE_ID",
             },
         }
 
-    RETURN_TYPES = (IO.IMAGE,)
-    RETURN_NAMES = ("image",)
+    RETURN_TYPES = (IO.IMAGE, IO.STRING, IO.STRING)
+    RETURN_NAMES = ("image", "urls", "url_lines")
+    OUTPUT_IS_LIST = (False, True, False)
     CATEGORY = "UCLOUD_MODELVERSE/Gpt-img"
     FUNCTION = "execute"
 
@@ -45,18 +56,29 @@ class GPTImage1Node:
         quality: str = "",
         output_format: str = "png",
         output_compression: int = 100,
+        total_images: int = 0,
+        download_images: bool = True,
+        graph=None,
+        unique_id=None,
     ):
 
         if not prompt:
             raise ValueError("Prompt is required")
 
-        mv_client = ModelverseClient(client["api_key"])
+        mv_client = ModelverseClient.from_client(client)
+
+        # Auto mode: split total_images by measured latency per images per call
+        counts = [num_images] * num_requests
+        if total_images > 0:
+            counts = plan_images(MODEL, total_images, limiter=mv_client.limiter)
+            print("INFO:", f"Auto mode: {total_images} image(s) as {describe(counts)}.")
+        num_requests = len(counts)
 
         tasks = [
-            mv_client.async_send_request(
+            partial(mv_client.async_send_request,
                 GPTImage1(
                     prompt=prompt,
-                    num_images=num_images,
+                    num_images=counts[i],
                     size=size,
                     quality=quality if quality != "" else None,
                     output_format=output_format,
@@ -66,62 +88,14 @@ class GPTImage1Node:
             for i in range(num_requests)
         ]
 
-        results = await mv_client.run_tasks(tasks)
-
-        output_images_list: List[torch.Tensor] = []
-        for data_list in results:
-            if not data_list:
-                print("WARN:", "No output in current request. Skipping...")
-                continue
-
-            # Auto-detect output type: prefer URL if present, else decode b64_json
-            has_url = False
-            try:
-                for item in data_list:
-                    if isinstance(item, dict) and item.get("url"):
-                        has_url = True
-                        break
-            except Exception:
-                has_url = False
-
-            if has_url:
-                try:
-                    output_images = imageurl2tensor(data_list)
-                except Exception:
-                    print("WARN:", "Failed to load URL images; attempting b64_json decode.")
-                    has_url = False  # fall through to b64 decode
-
-            if not has_url:
-                images = []
-                for item in data_list:
-                    if not isinstance(item, dict):
-                        continue
-                    b64v = item.get("b64_json") or item.get("b64")
-                    if not b64v:
-                        continue
-                    if isinstance(b64v, str) and b64v.startswith("data:"):
-                        try:
-                            b64v = b64v.split(",", 1)[1]
-                        except Exception:
-                            pass
-                    try:
-                        img_bytes = base64.b64decode(b64v)
-                        pil_img = decode_image(img_bytes)
-                        images.append(pil_img)
-                    except Exception:
-                        continue
-
-                if not images:
-                    print("WARN:", "No decodable base64 image found.")
-                    continue
-                output_images = images2tensor(images)
-
-            output_images_list.append(output_images)
-
-        if not output_images_list:
-            return (torch.zeros((1, 3, 1, 1)),)
-
-        return (torch.cat(output_images_list, dim=0),)
+        # Each request's first image is previewed on the node as it completes
+        previews = ResultPreviewer(len(tasks), enabled=output_connected(graph, unique_id))
+        results = await mv_client.run_tasks(tasks, on_result=previews, merge=not total_images,
+                                            max_parallel=MAX_PARALLEL if total_images else None)
+
+        # The urls outputs can feed video nodes directly; images are only
+        # downloaded and decoded if download_images is on
+        return await image_results_outputs(results, download_images)
 
 
 NODE_CLASS_MAPPINGS = {
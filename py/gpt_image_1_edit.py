@@ -1,11 +1,11 @@
-import base64
-import torch
-from typing import List
+import asyncio
+from functools import partial
 from comfy.comfy_types.node_typing import IO
 
 from .modelverse_api.client import ModelverseClient
+from .modelverse_api.progress import ResultPreviewer
 from .modelverse_api.requests.gpt_image_1_edit import GPTImage1Edit
-from .modelverse_api.utils import imageurl2tensor, decode_image, images2tensor
+from .modelverse_api.utils import output_connected, results2tensor
 
 
 class GPTImage1EditNode:
@@ -30,6 +30,10 @@ class GPTImage1EditNode:
                 "output_format": (["png", "jpeg"], {"default": "png"}),
                 "output_compression": (IO.INT, {"default": 100, "min": 0, "max": 100, "step": 1, "display": "number"}),
             },
+            "hidden": {
+                "graph": "PROMPT",
+                "unique_id": "UNIQUE_ID",
+            },
         }
 
     RETURN_TYPES = (IO.IMAGE,)
@@ -49,6 +53,8 @@ class GPTImage1EditNode:
         quality: str = "",
         output_format: str = "png",
         output_compression: int = 100,
+        graph=None,
+        unique_id=None,
     ):
 
         if not prompt:
@@ -56,10 +62,10 @@ class GPTImage1EditNode:
         if image is None:
             raise ValueError("Input image is required")
 
-        mv_client = ModelverseClient(client["api_key"])
+        mv_client = ModelverseClient.from_client(client)
 
         tasks = [
-            mv_client.async_send_request(
+            partial(mv_client.async_send_request,
                 GPTImage1Edit(
                     prompt=prompt,
                     image=image,
@@ -74,53 +80,12 @@ class GPTImage1EditNode:
             for _ in range(num_requests)
         ]
 
-        results = await mv_client.run_tasks(tasks)
-
-        output_images_list: List[torch.Tensor] = []
-        for data_list in results:
-            if not data_list:
-                print("WARN:", "No output in current request. Skipping...")
-                continue
-
-            # Auto-detect URL vs b64_json
-            has_url = any(isinstance(it, dict) and it.get("url") for it in data_list)
-            if has_url:
-                try:
-                    output_images = imageurl2tensor(data_list)
-                except Exception:
-                    print("WARN:", "Failed to load URL images; attempting b64_json decode.")
-                    has_url = False
-
-            if not has_url:
-                images = []
-                for item in data_list:
-                    if not isinstance(item, dict):
-                        continue
-                    b64v = item.get("b64_json") or item.get("b64")
-                    if not b64v:
-                        continue
-                    if isinstance(b64v, str) and b64v.startswith("data:"):
-                        try:
-                            b64v = b64v.split(",", 1)[1]
-                        except Exception:
-                            pass
-                    try:
-                        img_bytes = base64.b64decode(b64v)
-                        pil_img = decode_image(img_bytes)
-                        images.append(pil_img)
-                    except Exception:
-                        continue
-                if not images:
-                    print("WARN:", "No decodable base64 image found.")
-                    continue
-                output_images = images2tensor(images)
-
-            output_images_list.append(output_images)
-
-        if not output_images_list:
-            return (torch.zeros((1, 3, 1, 1)),)
+        # Each request's first image is previewed on the node as it completes
+        previews = ResultPreviewer(len(tasks), enabled=output_connected(graph, unique_id))
+        results = await mv_client.run_tasks(tasks, on_result=previews)
 
-        return (torch.cat(output_images_list, dim=0),)
+        # Decode every item of every request off the event loop, into one batch
+        return (await asyncio.to_thread(results2tensor, results),)
 
 
 NODE_CLASS_MAPPINGS = {
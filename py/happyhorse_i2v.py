@@ -2,9 +2,9 @@
 HappyHorse 1.0 Image2Video
 Model: happyhorse-1.0-i2v
 """
-import time
 from .modelverse_api.client import ModelverseClient
-from .modelverse_api.utils import image_to_base64
+from .modelverse_api.polling import poll_task
+from .modelverse_api.utils import image_to_url
 from comfy.comfy_types.node_typing import IO
 
 
@@ -80,12 +80,12 @@ class HappyHorseImg2VideoNode:
         if not has_url and not has_image:
             raise ValueError("first_frame_image or first_frame_url is required for HappyHorse I2V")
 
-        mv_client = ModelverseClient(api_key)
+        mv_client = ModelverseClient.from_client(client)
         task_input = {}
         if has_url:
             task_input["first_frame_url"] = first_frame_url.strip()
         else:
-            task_input["first_frame_url"] = image_to_base64(first_frame_image)
+            task_input["first_frame_url"] = image_to_url(first_frame_image, MODEL)
 
         if prompt and prompt.strip():
             task_input["prompt"] = prompt.strip()
@@ -108,25 +108,7 @@ class HappyHorseImg2VideoNode:
         return (video_url, task_id)
 
     def _poll_task(self, mv_client, task_id, max_retries=180):
-        for i in range(max_retries):
-            status_res = mv_client.get_task_status(task_id)
-            task_status = status_res.get("output", {}).get("task_status")
-
-            if task_status == "Success":
-                urls = status_res.get("output", {}).get("urls", [])
-                if urls:
-                    return urls[0]
-                raise Exception("Task succeeded but no video URL returned")
-            if task_status == "Failure":
-                error = status_res.get("output", {}).get("error_message", "Unknown error")
-                raise Exception(f"Task failed: {error}")
-            if task_status in ["Pending", "Running"]:
-                print(f"Task {task_id}: {task_status} ({i + 1}/{max_retries})")
-                time.sleep(5)
-                continue
-            raise Exception(f"Unknown status: {task_status}")
-
-        raise Exception("Task timed out")
+        return poll_task(mv_client, task_id, max_retries=max_retries)
 
 
 NODE_CLASS_MAPPINGS = {
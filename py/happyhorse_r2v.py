@@ -2,9 +2,10 @@
 HappyHorse 1.0 Reference2Video
 Model: happyhorse-1.0-r2v
 """
-import time
 from .modelverse_api.client import ModelverseClient
-from .modelverse_api.utils import image_to_base64
+from .modelverse_api.polling import poll_task
+from .modelverse_api.executor import parallel_map
+from .modelverse_api.utils import image_to_url
 from comfy.comfy_types.node_typing import IO
 
 
@@ -88,10 +89,8 @@ class HappyHorseReference2VideoNode:
         if not prompt or not prompt.strip():
             raise ValueError("prompt is required for HappyHorse R2V")
 
-        images = []
-        for img in [image1, image2, image3, image4]:
-            if img is not None:
-                images.append(image_to_base64(img))
+        images = parallel_map(lambda img: image_to_url(img, MODEL),
+                              [img for img in [image1, image2, image3, image4] if img is not None])
 
         if image_urls and image_urls.strip():
             for url in image_urls.strip().split("\n"):
@@ -102,7 +101,7 @@ class HappyHorseReference2VideoNode:
         if not images:
             raise ValueError("At least one reference image is required for HappyHorse R2V")
 
-        mv_client = ModelverseClient(api_key)
+        mv_client = ModelverseClient.from_client(client)
         task_input = {
             "prompt": prompt.strip(),
             "images": images,
@@ -126,25 +125,7 @@ class HappyHorseReference2VideoNode:
         return (video_url, task_id)
 
     def _poll_task(self, mv_client, task_id, max_retries=180):
-        for i in range(max_retries):
-            status_res = mv_client.get_task_status(task_id)
-            task_status = status_res.get("output", {}).get("task_status")
-
-            if task_status == "Success":
-                urls = status_res.get("output", {}).get("urls", [])
-                if urls:
-                    return urls[0]
-                raise Exception("Task succeeded but no video URL returned")
-            if task_status == "Failure":
-                error = status_res.get("output", {}).get("error_message", "Unknown error")
-                raise Exception(f"Task failed: {error}")
-            if task_status in ["Pending", "Running"]:
-                print(f"Task {task_id}: {task_status} ({i + 1}/{max_retries})")
-                time.sleep(5)
-                continue
-            raise Exception(f"Unknown status: {task_status}")
-
-        raise Exception("Task timed out")
+        return poll_task(mv_client, task_id, max_retries=max_retries)
 
 
 NODE_CLASS_MAPPINGS = {
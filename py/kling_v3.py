@@ -1,8 +1,8 @@
 """
 Kling V3 - Unified text/image-to-video and motion control model
 """
-import time
 from .modelverse_api.client import ModelverseClient
+from .modelverse_api.polling import poll_task
 from .modelverse_api.requests.kling_common import (
     ASPECT_RATIOS,
     CHARACTER_ORIENTATIONS,
@@ -125,7 +125,7 @@ class KlingV3Node:
             keep_original_sound=keep_original_sound,
         )
 
-        mv_client = ModelverseClient(api_key)
+        mv_client = ModelverseClient.from_client(client)
         print(f"Submitting Kling V3 task: model={MODEL_KLING_V3}, type={kling_v3_type}, prompt={prompt!r}")
         submit_res = mv_client.submit_task_request(request)
         task_id = submit_res.get("output", {}).get("task_id")
@@ -137,25 +137,7 @@ class KlingV3Node:
         return (video_url, task_id)
 
     def _poll_task(self, mv_client, task_id, max_retries=180):
-        for i in range(max_retries):
-            status_res = mv_client.get_task_status(task_id)
-            task_status = status_res.get("output", {}).get("task_status")
-
-            if task_status == "Success":
-                urls = status_res.get("output", {}).get("urls", [])
-                if urls:
-                    return urls[0]
-                raise Exception("Task succeeded but no video URL returned")
-            if task_status == "Failure":
-                error = status_res.get("output", {}).get("error_message", "Unknown error")
-                raise Exception(f"Task failed: {error}")
-            if task_status in ["Pending", "Running"]:
-                print(f"Task {task_id}: {task_status} ({i + 1}/{max_retries})")
-                time.sleep(5)
-                continue
-            raise Exception(f"Unknown status: {task_status}")
-
-        raise Exception("Task timed out")
+        return poll_task(mv_client, task_id, max_retries=max_retries)
 
 
 NODE_CLASS_MAPPINGS = {
@@ -1,8 +1,8 @@
 """
 Kling V3 Omni - Multimodal video generation and editing model
 """
-import time
 from .modelverse_api.client import ModelverseClient
+from .modelverse_api.polling import poll_task
 from .modelverse_api.requests.kling_common import (
     ASPECT_RATIOS,
     MODEL_KLING_V3_OMNI,
@@ -124,7 +124,7 @@ class KlingV3OmniNode:
             sound=sound,
         )
 
-        mv_client = ModelverseClient(api_key)
+        mv_client = ModelverseClient.from_client(client)
         print(f"Submitting Kling V3 Omni task: model={MODEL_KLING_V3_OMNI}, prompt={prompt!r}")
         submit_res = mv_client.submit_task_request(request)
         task_id = submit_res.get("output", {}).get("task_id")
@@ -136,25 +136,7 @@ class KlingV3OmniNode:
         return (video_url, task_id)
 
     def _poll_task(self, mv_client, task_id, max_retries=180):
-        for i in range(max_retries):
-            status_res = mv_client.get_task_status(task_id)
-            task_status = status_res.get("output", {}).get("task_status")
-
-            if task_status == "Success":
-                urls = status_res.get("output", {}).get("urls", [])
-                if urls:
-                    return urls[0]
-                raise Exception("Task succeeded but no video URL returned")
-            if task_status == "Failure":
-                error = status_res.get("output", {}).get("error_message", "Unknown error")
-                raise Exception(f"Task failed: {error}")
-            if task_status in ["Pending", "Running"]:
-                print(f"Task {task_id}: {task_status} ({i + 1}/{max_retries})")
-                time.sleep(5)
-                continue
-            raise Exception(f"Unknown status: {task_status}")
-
-        raise Exception("Task timed out")
+        return poll_task(mv_client, task_id, max_retries=max_retries)
 
 
 NODE_CLASS_MAPPINGS = {
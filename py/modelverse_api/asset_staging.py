@@ -0,0 +1,144 @@
+"""
+Upload-once staging of input images.
+
+Video models accept http(s) URLs for frames and reference images. When an
+upload endpoint is configured in the [ASSETS] section of config.ini, input
+images are uploaded once and the hosted URL is reused for the same content
+until it expires, instead of inlining a multi-megabyte base64 data URI in
+every submit.
+
+UPLOAD_URL may be:
+    - an HTTP endpoint accepting a multipart "file" field and answering JSON
+      with a "url" (or {"data": {"url": ...}}) field;
+    - "local", which keeps the files in staged_assets/ and serves them from
+      this ComfyUI server at /modelverse-assets/{name}. PUBLIC_BASE_URL must
+      then be the address at which Modelverse can reach ComfyUI. This is also
+      the easiest stand-in for testing.
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+import requests
+
+from .settings import PLUGIN_DIR, get_int, get_setting
+
+
+LOCAL_ASSET_DIR = os.path.join(PLUGIN_DIR, "staged_assets")
+LOCAL_ASSET_ROUTE = "/modelverse-assets"
+LOCAL_ASSET_NAME = re.compile(r"^[0-9a-f]{64}\.(jpeg|png|webp)$")
+
+
+class AssetStager:
+
+    def __init__(self, upload_url: str = "", public_base_url: str = "", expiry: int = 3600, token: str = ""):
+        self.upload_url = upload_url
+        self.public_base_url = public_base_url.rstrip("/")
+        self.expiry = expiry
+        self.token = token
+        self._lock = threading.Lock()
+        self._urls = {}  # content digest -> (url, expires_at)
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            upload_url=get_setting("ASSETS", "UPLOAD_URL"),
+            public_base_url=get_setting("ASSETS", "PUBLIC_BASE_URL"),
+            expiry=get_int("ASSETS", "EXPIRY_SECONDS", 3600),
+            token=get_setting("ASSETS", "UPLOAD_TOKEN"),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        if self.upload_url == "local":
+            return bool(self.public_base_url)
+        return bool(self.upload_url)
+
+    def lookup(self, digest: str) -> Optional[str]:
+        with self._lock:
+            entry = self._urls.get(digest)
+            if entry and entry[1] > time.time():
+                return entry[0]
+            return None
+
+    def stage(self, digest: str, encode: Callable[[], Tuple[bytes, str]]) -> Optional[str]:
+        """
+        Return a hosted URL for the content identified by digest.
+
+        encode() is only called on a cache miss and must return (bytes, format).
+        Returns None when staging is disabled or the upload fails, so callers
+        can fall back to inlining the image.
+        """
+        if not self.enabled:
+            return None
+        url = self.lookup(digest)
+        if url:
+            return url
+        data_bytes, fmt = encode()
+        try:
+            if self.upload_url == "local":
+                url = self._store_local(digest, data_bytes, fmt)
+            else:
+                url = self._upload(digest, data_bytes, fmt)
+        except Exception as e:
+            print("WARN:", f"Asset upload failed, sending image inline instead: {e}")
+            return None
+        with self._lock:
+            self._prune()
+            self._urls[digest] = (url, time.time() + self.expiry)
+        return url
+
+    def _upload(self, digest: str, data_bytes: bytes, fmt: str) -> str:
+        ext = fmt.lower()
+        headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        files = {"file": (f"{digest}.{ext}", data_bytes, f"image/{ext}")}
+        response = requests.post(self.upload_url, headers=headers, files=files, timeout=60)
+        response.raise_for_status()
+        body = response.json()
+        url = body.get("url") or (body.get("data") or {}).get("url")
+        if not url:
+            raise Exception(f"No url in upload response: {body}")
+        return url
+
+    def _store_local(self, digest: str, data_bytes: bytes, fmt: str) -> str:
+        os.makedirs(LOCAL_ASSET_DIR, exist_ok=True)
+        name = f"{digest}.{fmt.lower()}"
+        path = os.path.join(LOCAL_ASSET_DIR, name)
+        if not os.path.exists(path):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data_bytes)
+            os.replace(tmp_path, path)
+        return f"{self.public_base_url}{LOCAL_ASSET_ROUTE}/{name}"
+
+    def _prune(self):
+        now = time.time()
+        for digest, (url, expires_at) in list(self._urls.items()):
+            if expires_at > now:
+                continue
+            del self._urls[digest]
+            if self.upload_url == "local":
+                path = local_asset_path(url.rsplit("/", 1)[-1])
+                if path and os.path.exists(path):
+                    os.remove(path)
+
+
+def local_asset_path(name: str) -> Optional[str]:
+    """Path of a locally staged asset, or None for names we did not create."""
+    if not LOCAL_ASSET_NAME.match(name):
+        return None
+    return os.path.join(LOCAL_ASSET_DIR, name)
+
+
+def image_digest(img) -> str:
+    """Content hash of a PIL image's pixels."""
+    hasher = hashlib.sha256()
+    hasher.update(f"{img.mode}:{img.size}".encode("utf-8"))
+    hasher.update(img.tobytes())
+    return hasher.hexdigest()
+
+
+asset_stager = AssetStager.from_settings()
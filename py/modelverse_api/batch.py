@@ -0,0 +1,161 @@
+"""
+Fan-out batches that tolerate partial failure.
+
+Nodes that send num_requests requests at once used to lose every result when
+one request failed, although the others had already been generated and
+billed. run_batch collects the outcome of each request instead, retries only
+the failed ones (within a retry budget for the whole batch) and returns what
+succeeded, with a report of what did not. It raises only if fewer requests
+succeed than the configured minimum:
+
+    [BATCH]
+    RETRY_BUDGET = 2         ; retries shared by all failed requests of a batch
+    MIN_SUCCESS_RATIO = 0    ; 0 = at least one request, 1 = all requests
+"""
+import asyncio
+import inspect
+import math
+from typing import List, Optional
+
+from .metrics import metrics
+from .polling import is_interrupt, throw_if_interrupted
+from .settings import get_float, get_int
+
+
+RETRY_BUDGET = get_int("BATCH", "RETRY_BUDGET", 2)
+MIN_SUCCESS_RATIO = get_float("BATCH", "MIN_SUCCESS_RATIO", 0.0)
+# Client errors that a retry cannot fix
+PERMANENT_STATUS_CODES = {400, 401, 403, 404, 422}
+
+
+class BatchReport:
+    """Outcome of a batch: results in request order (None where failed) and the failures."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.results: List[Optional[object]] = [None] * size
+        self.attempts = [0] * size
+        self.errors = {}  # index -> last exception
+        self.retries = 0
+
+    @property
+    def succeeded(self) -> List[object]:
+        return [result for i, result in enumerate(self.results) if i not in self.errors]
+
+    def failures(self) -> List[dict]:
+        return [
+            {"index": i, "attempts": self.attempts[i], "error": str(error),
+             "status_code": getattr(error, "status_code", None)}
+            for i, error in sorted(self.errors.items())
+        ]
+
+    def summary(self) -> str:
+        lines = [f"{self.size - len(self.errors)}/{self.size} request(s) succeeded, {self.retries} retried."]
+        lines += [f"  request {f['index'] + 1}: {f['error']} (after {f['attempts']} attempt(s))" for f in self.failures()]
+        return "\n".join(lines)
+
+
+class BatchError(Exception):
+    """Too few requests of a batch succeeded; report holds the details."""
+
+    def __init__(self, report: BatchReport):
+        super().__init__(f"Batch failed: {report.summary()}")
+        self.report = report
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, ValueError) or is_interrupt(error):
+        return False
+    return getattr(error, "status_code", None) not in PERMANENT_STATUS_CODES
+
+
+def required_successes(size: int, min_success_ratio: float) -> int:
+    return max(1, math.ceil(size * min(max(min_success_ratio, 0.0), 1.0))) if size else 0
+
+
+async def run_batch(tasks, retry_budget: int = RETRY_BUDGET,
+                    min_success_ratio: float = MIN_SUCCESS_RATIO, on_result=None,
+                    max_parallel: Optional[int] = None) -> BatchReport:
+    """
+    Run tasks concurrently and return a BatchReport.
+
+    Each task is either a zero-argument callable returning an awaitable, which
+    can be retried, or an awaitable, which runs once. Raises BatchError if
+    fewer than min_success_ratio of the tasks succeed. on_result(index, result),
+    a coroutine function, is awaited as each task succeeds, in completion order.
+    At most max_parallel tasks run at once if given; the others wait their turn.
+    Cancel in ComfyUI ends the batch at once: the remaining tasks are cancelled
+    and the interrupt is raised.
+    """
+    report = BatchReport(len(tasks))
+    pending = list(range(len(tasks)))
+    budget = retry_budget
+    slots = asyncio.Semaphore(max_parallel) if max_parallel else None
+
+    async def run(i):
+        if slots is None:
+            result = await _start(tasks[i])
+        else:
+            async with slots:
+                result = await _start(tasks[i])
+        if on_result is not None:
+            try:
+                await on_result(i, result)
+            except Exception as e:
+                print("WARN:", f"Cannot process result {i + 1} early: {e}")
+        return result
+
+    while pending:
+        outcomes = await _gather(run(i) for i in pending)
+        failed = []
+        for i, outcome in zip(pending, outcomes):
+            report.attempts[i] += 1
+            if isinstance(outcome, BaseException):
+                report.errors[i] = outcome
+                failed.append(i)
+            else:
+                report.results[i] = outcome
+                report.errors.pop(i, None)
+        # A Cancel noticed by no request still ends the batch before any retry
+        throw_if_interrupted()
+        retryable = [i for i in failed if callable(tasks[i]) and is_retryable(report.errors[i])]
+        pending = retryable[:max(budget, 0)]
+        budget -= len(pending)
+        report.retries += len(pending)
+        if pending:
+            print("WARN:", f"Retrying {len(pending)} failed request(s) of {len(tasks)}.")
+
+    metrics.incr("batch_retries", report.retries)
+    metrics.incr("batch_failed_requests", len(report.errors))
+    if report.errors:
+        print("WARN:", report.summary())
+    if len(report.succeeded) < required_successes(len(tasks), min_success_ratio):
+        raise BatchError(report) from next(iter(report.errors.values()), None)
+    return report
+
+
+async def _gather(coroutines) -> list:
+    """
+    Outcomes of coroutines in order, exceptions included, like gather with
+    return_exceptions, except that an interrupt (or other BaseException)
+    cancels the others and is raised as soon as it happens.
+    """
+    futures = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        waiting = set(futures)
+        while waiting:
+            done, waiting = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is not None and (is_interrupt(error) or not isinstance(error, Exception)):
+                    raise error
+    finally:
+        for future in futures:
+            future.cancel()
+    return [future.exception() or future.result() for future in futures]
+
+
+def _start(task):
+    if callable(task) and not inspect.isawaitable(task):
+        return task()
+    return task
@@ -0,0 +1,110 @@
+"""
+Task completion callbacks, an alternative to polling every task every 5 s.
+
+When URL is set in the [CALLBACK] section of config.ini, submitted tasks carry
+a callback_url pointing at this ComfyUI server's /modelverse-callback route,
+and waiting nodes are woken when Modelverse posts the task's status there.
+Status is still polled, but only every FALLBACK_POLL_SECONDS, in case a
+notification is lost.
+
+    [CALLBACK]
+    URL = http://<address reachable by Modelverse>:8188
+    TOKEN = <shared secret, sent back as ?token=>
+    FALLBACK_POLL_SECONDS = 60
+
+Every notification must carry the token. Without TOKEN a random one is
+generated at startup, so the route is never open to anyone who can reach the
+ComfyUI port; tasks submitted before a restart then fall back to polling.
+
+The route accepts the same body as a /v1/tasks/status response
+({"output": {"task_id": ..., "task_status": ..., "urls": [...]}}) or the
+flat output object, so any local stand-in that posts such JSON can drive it.
+"""
+import hmac
+import secrets
+import threading
+import time
+from typing import Optional
+from urllib.parse import quote
+
+from .metrics import metrics
+from .settings import get_int, get_setting
+
+
+CALLBACK_ROUTE = "/modelverse-callback"
+# Notifications for tasks nobody waits for (yet) are kept this long
+UNCLAIMED_TTL = 600
+
+
+class CallbackReceiver:
+
+    def __init__(self, base_url: str = "", token: str = "", fallback_poll_seconds: int = 60):
+        self.base_url = base_url.rstrip("/")
+        self.token = token or secrets.token_urlsafe(24)
+        self.fallback_poll_seconds = fallback_poll_seconds
+        self._lock = threading.Lock()
+        self._events = {}   # task_id -> Event of a waiting poller
+        self._updates = {}  # task_id -> (received_at, latest status response)
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            base_url=get_setting("CALLBACK", "URL"),
+            token=get_setting("CALLBACK", "TOKEN"),
+            fallback_poll_seconds=get_int("CALLBACK", "FALLBACK_POLL_SECONDS", 60),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.base_url)
+
+    def callback_url(self) -> Optional[str]:
+        if not self.enabled:
+            return None
+        return f"{self.base_url}{CALLBACK_ROUTE}?token={quote(self.token)}"
+
+    def check_token(self, token: Optional[str]) -> bool:
+        return self.enabled and token is not None and hmac.compare_digest(token.encode("utf-8"),
+                                                                          self.token.encode("utf-8"))
+
+    def register(self, task_id: str, event: Optional[threading.Event] = None) -> threading.Event:
+        """Wait for notifications about task_id; event is set whenever one arrives."""
+        with self._lock:
+            event = self._events.setdefault(task_id, event or threading.Event())
+            if task_id in self._updates:  # notified before we started waiting
+                event.set()
+            return event
+
+    def unregister(self, task_id: str):
+        with self._lock:
+            self._events.pop(task_id, None)
+            self._updates.pop(task_id, None)
+
+    def take(self, task_id: str) -> Optional[dict]:
+        """Latest status posted for task_id since the last call, if any."""
+        with self._lock:
+            update = self._updates.pop(task_id, None)
+        return update[1] if update else None
+
+    def notify(self, body) -> bool:
+        """Store a posted status and wake its waiter. False if it names no task."""
+        if not isinstance(body, dict):
+            return False
+        output = body.get("output") if isinstance(body.get("output"), dict) else body
+        task_id = output.get("task_id") or body.get("task_id")
+        if not task_id:
+            return False
+        metrics.incr("task_callbacks")
+        now = time.time()
+        with self._lock:
+            self._updates[task_id] = (now, {"output": output})
+            for stale_id, (received_at, _) in list(self._updates.items()):
+                if received_at < now - UNCLAIMED_TTL and stale_id not in self._events:
+                    del self._updates[stale_id]
+            event = self._events.get(task_id)
+            if event is not None:
+                event.set()
+        return True
+
+
+callback_receiver = CallbackReceiver.from_settings()
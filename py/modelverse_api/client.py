@@ -1,45 +1,153 @@
 import time
+import threading
 import requests
 import asyncio
+from requests.adapters import HTTPAdapter
+from .batch import run_batch
+from .callbacks import callback_receiver
+from .concurrency import AdaptiveLimiter
+from .hedging import hedger, mark_sent
+from .json_stream import parse_response
+from .metrics import metrics
+from .micro_batch import MicroBatcher, merging_enabled
+from .polling import POLL_INTERVAL, check_interrupted
+from .settings import get_setting
+from .single_flight import SingleFlight, request_fingerprint
+from .status_batcher import StatusBatcher
+from .task_journal import SUBMITTED, task_journal
 from .utils import BaseRequest
 
+# Connections kept alive per host by each shared client
+POOL_MAXSIZE = 32
+# CANCEL_ENDPOINT = off in the [TASKS] section never cancels remote tasks
+CANCEL_ENDPOINT = get_setting("TASKS", "CANCEL_ENDPOINT", "/v1/tasks/cancel")
+
+
+class ModelverseAPIError(Exception):
+    """API error carrying the HTTP status code and response headers."""
+
+    def __init__(self, message, status_code=None, headers=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.headers = headers
 
-import asyncio
-from .utils import BaseRequest
 
 class ModelverseClient:
     BASE_URL = "https://api.modelverse.cn"
 
-    def __init__(self, api_key):
+    def __init__(self, api_key, key_pool=None):
         self.api_key = api_key
+        self.key_pool = key_pool
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
+        self._single_flight = SingleFlight()
+        self._micro_batcher = MicroBatcher()
+        self.limiter = AdaptiveLimiter.from_settings()
+        poll_interval = callback_receiver.fallback_poll_seconds if callback_receiver.enabled else POLL_INTERVAL
+        self.status_batcher = StatusBatcher(self, interval=poll_interval)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
-    def post(self, endpoint, payload, timeout=180):
+    @classmethod
+    def from_client(cls, client):
+        """Return the shared client for a MODELVERSE_API_CLIENT value."""
+        if isinstance(client, ModelverseClientHandle):
+            return client.client
+        api_key = client.get("api_key")
+        if not api_key:
+            raise ValueError("API key is not set")
+        return get_shared_client(api_key, key_pool=client.get("key_pool"))
+
+    def _send(self, method, endpoint, headers, parser=None, interruptible=True, **kwargs):
         url = f"{self.BASE_URL}{endpoint}"
-        response = requests.post(url, headers=self.headers, json=payload, timeout=timeout)
-        return self._handle_response(response)
+        model = _model_of(endpoint, kwargs)
+        # Wait for a slot in the model's adaptive concurrency window; the
+        # check leaves ComfyUI's interrupt flag set for the other threads
+        limited = self.limiter.acquire(model, check_interrupted if interruptible else None)
+        mark_sent()
+        start = time.monotonic()
+        ok = False
+        error = response_headers = None
+        try:
+            response = self.session.request(method, url, headers=headers, stream=parser is not None, **kwargs)
+            response_headers = response.headers
+            try:
+                result = self._handle_response(response, parser)
+            finally:
+                response.close()
+            ok = True
+            return result, response
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            seconds = time.monotonic() - start
+            n = _images_of(kwargs)
+            metrics.record(endpoint, model, seconds, ok, n=n)
+            if limited:
+                self.limiter.release(model, seconds, error=error, headers=response_headers, n=n)
+
+    def _request(self, method, endpoint, headers, task_id=None, interruptible=True, **kwargs):
+        if interruptible:
+            check_interrupted()
+        kwargs["interruptible"] = interruptible
+        if self.key_pool is None:
+            result, _ = self._send(method, endpoint, headers, **kwargs)
+            return result
+
+        key = self.key_pool.acquire(task_id=task_id, check=check_interrupted if interruptible else None)
+        headers = {**headers, "Authorization": f"Bearer {key.api_key}"}
+        try:
+            result, response = self._send(method, endpoint, headers, **kwargs)
+        except ModelverseAPIError as e:
+            self.key_pool.release(key, status_code=e.status_code, headers=e.headers, error=e)
+            raise
+        except Exception as e:
+            self.key_pool.release(key, error=e)
+            raise
+        self.key_pool.release(key, headers=response.headers)
+        if task_id is None and isinstance(result, dict):
+            submitted_id = (result.get("output") or {}).get("task_id")
+            if submitted_id:
+                self.key_pool.pin_task(submitted_id, key)
+        return result
+
+    def post(self, endpoint, payload, timeout=180):
+        # Compatible random-seed image requests are merged into one n-image
+        # call; identical seeded requests already in flight are sent only once.
+        # A slow call may be hedged with a duplicate, which bypasses both.
+        return self._micro_batcher.run(endpoint, payload, lambda payload: self._single_flight.run(
+            request_fingerprint(endpoint, payload),
+            lambda: hedger.run(endpoint, _model_of(endpoint, {"json": payload}), lambda: self._request(
+                "POST", endpoint, self.headers, json=payload, timeout=timeout), n=_images_of({"json": payload}))))
+
+    def post_stream(self, endpoint, payload, timeout=180):
+        """
+        POST whose JSON response is parsed while it streams in, with every
+        inlineData.data string returned as a BytesIO of the decoded bytes.
+        """
+        return hedger.run(endpoint, _model_of(endpoint, {"json": payload}), lambda: self._request(
+            "POST", endpoint, self.headers, parser=parse_response, json=payload, timeout=timeout))
 
     def post_multipart(self, endpoint, data=None, files=None, timeout=180):
         """POST with multipart/form-data. Content-Type is set by requests automatically."""
-        url = f"{self.BASE_URL}{endpoint}"
         # Do not set Content-Type explicitly when using files; requests will handle it.
         headers = {k: v for k, v in self.headers.items() if k.lower() != "content-type"}
-        response = requests.post(url, headers=headers, data=data, files=files, timeout=timeout)
-        return self._handle_response(response)
+        return self._request("POST", endpoint, headers, data=data, files=files, timeout=timeout)
 
-    def get(self, endpoint, params=None, timeout=180):
-        url = f"{self.BASE_URL}{endpoint}"
+    def get(self, endpoint, params=None, timeout=180, task_id=None, interruptible=True):
         headers = {"Authorization": f"Bearer {self.api_key}"}
-        response = requests.get(url, headers=headers, params=params, timeout=timeout)
-        return self._handle_response(response)
+        return self._request("GET", endpoint, headers, task_id=task_id, interruptible=interruptible,
+                             params=params, timeout=timeout)
 
-    def _handle_response(self, response):
+    def _handle_response(self, response, parser=None):
         if response.status_code == 401:
-            raise Exception("Unauthorized: Invalid API key")
-        
+            raise ModelverseAPIError("Unauthorized: Invalid API key", 401, response.headers)
+
         # For backward compatibility with older error formats
         if response.status_code != 200:
             error_message = f"Error: {response.status_code}"
@@ -49,14 +157,15 @@ class ModelverseClient:
                     error_message = f"Error: {error_data['error']}"
             except:
                 pass
-            raise Exception(error_message)
+            raise ModelverseAPIError(error_message, response.status_code, response.headers)
 
-        response_data = response.json()
+        response_data = parser(response) if parser else response.json()
         if isinstance(response_data, dict) and 'code' in response_data:
             if response_data['code'] == 401:
-                raise Exception("Unauthorized: Invalid API key")
+                raise ModelverseAPIError("Unauthorized: Invalid API key", 401, response.headers)
             if response_data['code'] != 200:
-                raise Exception(f"API Error: {response_data.get('message', 'Unknown error')}")
+                raise ModelverseAPIError(f"API Error: {response_data.get('message', 'Unknown error')}",
+                                         response_data['code'], response.headers)
             return response_data.get('data', {})
         return response_data
 
@@ -68,18 +177,47 @@ class ModelverseClient:
             "input": task_input,
             "parameters": parameters
         }
-        return self.post(endpoint, payload)
+        return self._journal_submit(model, self.post(endpoint, _with_callback(payload)))
 
     def submit_task_request(self, request: BaseRequest):
-        return self.post(request.API_PATH, request.build_payload())
+        payload = _with_callback(request.build_payload())
+        return self._journal_submit(payload.get("model"), self.post(request.API_PATH, payload))
+
+    def _journal_submit(self, model, result):
+        task_id = (result.get("output") or {}).get("task_id") if isinstance(result, dict) else None
+        if task_id:
+            task_journal.record(task_id, SUBMITTED, model=model)
+        return result
 
     def get_task_status(self, task_id):
         endpoint = f"/v1/tasks/status"
         params = {"task_id": task_id}
-        return self.get(endpoint, params=params)
-        
+        # Polled from background threads; the waiting node handles Cancel itself
+        return self.get(endpoint, params=params, task_id=task_id, interruptible=False)
+
+    def cancel_task(self, task_id):
+        """Ask Modelverse to stop a task. Best effort: returns False if that fails."""
+        if CANCEL_ENDPOINT == "off":
+            return False
+        try:
+            self._request("POST", CANCEL_ENDPOINT, self.headers, task_id=task_id, interruptible=False,
+                          json={"task_id": task_id}, timeout=30)
+        except Exception as e:
+            print("WARN:", f"Could not cancel task {task_id}: {e}")
+            return False
+        return True
+
     # --- Restored Async Methods for existing nodes ---
     async def async_send_request(self, request: BaseRequest):
+        # Run on a worker thread so requests gathered by run_tasks are in flight together
+        return await asyncio.to_thread(self.send_request, request)
+
+    async def async_post(self, endpoint, payload, timeout=180, stream=False):
+        """post() (or post_stream()) on a worker thread."""
+        post = self.post_stream if stream else self.post
+        return await asyncio.to_thread(post, endpoint, payload, timeout)
+
+    def send_request(self, request: BaseRequest):
         endpoint = request.API_PATH
         # Support multipart form requests when available
         if hasattr(request, "build_multipart") and callable(getattr(request, "build_multipart")):
@@ -92,7 +230,75 @@ class ModelverseClient:
             response = self.post(endpoint, payload)
         return response.get("data", [])
 
-    async def run_tasks(self, tasks):
+    async def run_tasks(self, tasks, on_result=None, merge=True, max_parallel=None):
+        """
+        Run requests concurrently and return the results of those that
+        succeeded, in order. Tasks given as callables (e.g. partial(
+        client.async_send_request, request)) are retried on failure; see batch.py.
+        on_result(index, result) is awaited as each request completes.
+        merge=False keeps the requests from being merged into fewer calls.
+        max_parallel bounds the requests in flight at once, as the planner assumes.
+        """
         print("INFO:", f"Sending {len(tasks)} request(s) concurrently...")
-        results = await asyncio.gather(*tasks)
-        return results
+        # Worker threads started from here inherit the setting (asyncio.to_thread copies the context)
+        token = merging_enabled.set(merge)
+        try:
+            report = await run_batch(tasks, on_result=on_result, max_parallel=max_parallel)
+        finally:
+            merging_enabled.reset(token)
+        return report.succeeded
+
+
+def _with_callback(payload):
+    """Task payload with the configured callback_url added to its parameters."""
+    callback_url = callback_receiver.callback_url()
+    if not callback_url or not isinstance(payload, dict):
+        return payload
+    return {**payload, "parameters": {**(payload.get("parameters") or {}), "callback_url": callback_url}}
+
+
+def _model_of(endpoint, kwargs):
+    """Best-effort model name of a request, used to key latency statistics."""
+    body = kwargs.get("json") or kwargs.get("data")
+    if isinstance(body, dict) and body.get("model"):
+        return body["model"]
+    if endpoint.startswith("/v1beta/models/"):
+        return endpoint[len("/v1beta/models/"):].split(":", 1)[0]
+    return None
+
+
+def _images_of(kwargs):
+    """Images requested per call (n), if the request says."""
+    body = kwargs.get("json")
+    n = body.get("n") if isinstance(body, dict) else None
+    return n if isinstance(n, int) else None
+
+
+class ModelverseClientHandle(dict):
+    """
+    MODELVERSE_API_CLIENT value.
+
+    Still a plain {"api_key": ...} dict for nodes that only read the key, but it
+    also carries the long-lived ModelverseClient registered for that key, so
+    connection pools and per-client state are reused across nodes and prompts.
+    """
+
+    def __init__(self, client: ModelverseClient):
+        super().__init__(api_key=client.api_key)
+        if client.key_pool is not None:
+            self["key_pool"] = client.key_pool
+        self.client = client
+
+
+_shared_clients = {}
+_shared_clients_lock = threading.Lock()
+
+
+def get_shared_client(api_key, key_pool=None) -> ModelverseClient:
+    """Return the client registered for this key (or key pool), creating it once."""
+    registry_key = ("pool", id(key_pool)) if key_pool is not None else api_key
+    with _shared_clients_lock:
+        client = _shared_clients.get(registry_key)
+        if client is None:
+            client = _shared_clients[registry_key] = ModelverseClient(api_key, key_pool=key_pool)
+        return client
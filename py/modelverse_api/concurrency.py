@@ -0,0 +1,159 @@
+"""
+Adaptive per-model concurrency (AIMD).
+
+Each client limits how many requests per model are in flight. The window
+grows by one request per window's worth of successful requests while latency
+stays near its baseline (a moving average per model and images per call),
+and is halved on a 429, a timeout or a latency spike (at most once per
+baseline latency, so one burst of errors counts once). Rate-limit headers
+are honoured when sent: x-ratelimit-remaining-requests = 0 counts as a 429
+and Retry-After pauses new requests. x-ratelimit-limit-requests is a rate
+per minute, not a concurrency, and is left to the key pool's pacing. The
+window starts at the largest fan-out of one node (num_requests), so the
+limiter does not slow a default workflow down before any signal. The
+current windows are reported under "gauges" at /modelverse-metrics.
+
+    [CONCURRENCY]
+    ADAPTIVE = true
+    INITIAL = 10
+    MIN = 1
+    MAX = 32
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+import requests
+
+from .metrics import metrics
+from .settings import get_bool, get_int
+
+
+# Multiplicative decrease factor
+BACKOFF = 0.5
+# A success slower than this multiple of the baseline latency is a spike
+SPIKE_FACTOR = 2.5
+# Weight of a new latency in the baseline moving average
+BASELINE_WEIGHT = 0.1
+# Successes needed before the baseline is trusted for spike detection
+BASELINE_SAMPLES = 5
+THROTTLED_STATUS_CODES = (429, 503)
+# Most requests a node sends at once (num_requests)
+NODE_FAN_OUT = 10
+WAIT_SLICE = 0.25
+
+
+class _ModelWindow:
+
+    def __init__(self, window: float):
+        self.window = window
+        self.in_flight = 0
+        self.baselines = {}  # images per call -> (moving average latency, samples)
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+
+
+class AdaptiveLimiter:
+
+    def __init__(self, enabled: bool = True, initial: int = NODE_FAN_OUT, minimum: int = 1, maximum: int = 32):
+        self.enabled = enabled
+        self.minimum = max(minimum, 1)
+        self.maximum = max(maximum, self.minimum)
+        self.initial = min(max(initial, self.minimum), self.maximum)
+        self._cond = threading.Condition()
+        self._models = {}
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            enabled=get_bool("CONCURRENCY", "ADAPTIVE", True),
+            initial=get_int("CONCURRENCY", "INITIAL", NODE_FAN_OUT),
+            minimum=get_int("CONCURRENCY", "MIN", 1),
+            maximum=get_int("CONCURRENCY", "MAX", 32),
+        )
+
+    def window(self, model: str) -> Optional[int]:
+        with self._cond:
+            state = self._models.get(model)
+            return int(state.window) if state else None
+
+    def available(self, model: str) -> Optional[int]:
+        """Requests of model that can start now without waiting, None if not limited."""
+        if not self.enabled:
+            return None
+        with self._cond:
+            state = self._models.get(model)
+            if state is None:
+                return self.initial
+            if time.time() < state.paused_until:
+                return 1
+            return max(int(state.window) - state.in_flight, 1)
+
+    def acquire(self, model: Optional[str], check: Optional[Callable] = None) -> bool:
+        """Wait for a free slot of model; check() runs while waiting. False if not limited."""
+        if not self.enabled or not model:
+            return False
+        with self._cond:
+            state = self._models.get(model)
+            if state is None:
+                state = self._models[model] = _ModelWindow(self.initial)
+            while state.in_flight >= int(state.window) or time.time() < state.paused_until:
+                if check is not None:
+                    check()
+                self._cond.wait(WAIT_SLICE)
+            state.in_flight += 1
+        return True
+
+    def release(self, model: str, seconds: float, error: Optional[BaseException] = None, headers=None,
+                n: Optional[int] = None):
+        """Return model's slot and adapt its window to how the request (of n images) went."""
+        now = time.time()
+        with self._cond:
+            state = self._models[model]
+            state.in_flight = max(state.in_flight - 1, 0)
+            throttled = self._apply_headers(state, headers, now)
+            status_code = getattr(error, "status_code", None)
+            throttled = throttled or status_code in THROTTLED_STATUS_CODES or isinstance(error, requests.Timeout)
+            baseline, samples = state.baselines.get(n, (None, 0))
+            spike = error is None and samples >= BASELINE_SAMPLES and seconds > baseline * SPIKE_FACTOR
+
+            if throttled or spike:
+                # Once per baseline latency: the requests of one window fail together
+                rtt = baseline or max((b for b, _ in state.baselines.values()), default=0.0)
+                if now - state.last_decrease >= rtt:
+                    state.window = max(state.window * BACKOFF, self.minimum)
+                    state.last_decrease = now
+                    metrics.incr("concurrency_decreases")
+                    reason = "rate limited" if throttled else f"latency spike ({seconds:.1f}s)"
+                    print("WARN:", f"{model} {reason}, concurrency window reduced to {int(state.window)}.")
+            elif error is None:
+                state.window = min(state.window + 1.0 / state.window, self.maximum)
+
+            if error is None:
+                # Spikes count too, so a lasting slowdown becomes the new baseline
+                baseline = seconds if baseline is None else \
+                    (1 - BASELINE_WEIGHT) * baseline + BASELINE_WEIGHT * seconds
+                state.baselines[n] = (baseline, samples + 1)
+            metrics.set_gauge(f"concurrency_window:{model}", int(state.window))
+            self._cond.notify_all()
+
+    def _apply_headers(self, state: _ModelWindow, headers, now: float) -> bool:
+        """Read rate-limit headers; True if they say the limit is reached."""
+        if headers is None:
+            return False
+        throttled = False
+        if _int_header(headers, "x-ratelimit-remaining-requests") == 0:
+            throttled = True
+        retry_after = _int_header(headers, "retry-after")
+        if retry_after:
+            state.paused_until = max(state.paused_until, now + retry_after)
+            throttled = True
+        return throttled
+
+
+def _int_header(headers, name: str) -> Optional[int]:
+    value = headers.get(name)
+    try:
+        return int(float(value)) if value is not None else None
+    except ValueError:
+        return None
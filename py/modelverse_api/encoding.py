@@ -0,0 +1,228 @@
+"""
+Encoder policy for outbound images.
+
+Picks PNG, JPEG or WebP and the encoder settings per target model, based on
+what the image contains:
+    - "alpha":   has transparency, needs a lossless format with alpha;
+    - "graphic": few distinct colours (UI, text, flat art), compresses well losslessly;
+    - "photo":   everything else, where a lossy format is 5-10x smaller than PNG.
+
+With a byte budget, lossy quality is stepped down until the image fits.
+Encode time and bytes are counted per setting actually used (e.g.
+"encode_ms:jpeg_q92" at /modelverse-metrics), and benchmark_encoders()
+reports time against bytes for every candidate format and quality on a given
+image (POST it to /modelverse-encoder-benchmark); use both when tuning the
+per-model policies below.
+"""
+import io
+import time
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from .input_limits import limit_for, target_size
+from .metrics import metrics
+
+
+GRAPHIC_MAX_COLORS = 256
+
+# Leading bytes of the formats that can be forwarded without transcoding
+SIGNATURES = (
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+)
+CONTENT_TYPES = {
+    "image/jpeg": "JPEG",
+    "image/jpg": "JPEG",
+    "image/pjpeg": "JPEG",
+    "image/png": "PNG",
+}
+
+
+class EncodePolicy:
+    """
+    Args:
+        formats: formats the target model accepts, in order of preference for photos
+        quality: starting quality for lossy formats
+        min_quality: lowest quality used when shrinking to fit byte_budget
+        byte_budget: target upper bound for the encoded size, None for no limit
+        png_compress_level: zlib level for PNG, lower is faster and larger
+    """
+
+    def __init__(self, formats=("JPEG", "PNG"), quality=85, min_quality=70,
+                 byte_budget: Optional[int] = None, png_compress_level=4):
+        self.formats = formats
+        self.quality = quality
+        self.min_quality = min_quality
+        self.byte_budget = byte_budget
+        self.png_compress_level = png_compress_level
+
+    def lossless_format(self) -> str:
+        return "PNG" if "PNG" in self.formats or "WEBP" not in self.formats else "WEBP"
+
+    def lossy_format(self) -> str:
+        for fmt in self.formats:
+            if fmt in ("JPEG", "WEBP"):
+                return fmt
+        return self.lossless_format()
+
+
+DEFAULT_POLICY = EncodePolicy()
+
+MODEL_POLICIES: Dict[str, EncodePolicy] = {
+    "gpt-image-1": EncodePolicy(formats=("WEBP", "JPEG", "PNG"), quality=90, byte_budget=20 * 1024 * 1024),
+    "gemini-2.5-flash-image": EncodePolicy(formats=("JPEG", "WEBP", "PNG"), quality=92, byte_budget=7 * 1024 * 1024),
+    "gemini-3.1-flash-image": EncodePolicy(formats=("JPEG", "WEBP", "PNG"), quality=92, byte_budget=7 * 1024 * 1024),
+    "gemini-3-pro-image": EncodePolicy(formats=("JPEG", "WEBP", "PNG"), quality=92, byte_budget=7 * 1024 * 1024),
+    "veo-3.1-generate-001": EncodePolicy(quality=92, byte_budget=10 * 1024 * 1024),
+    "veo-3.1-fast-generate-001": EncodePolicy(quality=92, byte_budget=10 * 1024 * 1024),
+    "kling-v3": EncodePolicy(quality=90, byte_budget=10 * 1024 * 1024),
+    "kling-v3-omni": EncodePolicy(quality=90, byte_budget=10 * 1024 * 1024),
+}
+
+
+def policy_for(model: Optional[str]) -> EncodePolicy:
+    return MODEL_POLICIES.get(model, DEFAULT_POLICY)
+
+
+def classify_content(img: Image.Image) -> str:
+    """Return "alpha", "graphic" or "photo"."""
+    if "A" in img.getbands() and img.getchannel("A").getextrema()[0] < 255:
+        return "alpha"
+    sample = img if img.width * img.height <= 256 * 256 else img.resize((256, 256), Image.NEAREST)
+    if sample.convert("RGB").getcolors(maxcolors=GRAPHIC_MAX_COLORS) is not None:
+        return "graphic"
+    return "photo"
+
+
+def _save(img: Image.Image, fmt: str, **params) -> bytes:
+    if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    with io.BytesIO() as bytes_io:
+        img.save(bytes_io, format=fmt, **params)
+        return bytes_io.getvalue()
+
+
+def _lossy_params(fmt: str, quality: int) -> dict:
+    if fmt == "JPEG":
+        # Keep full chroma resolution at high quality, 4:2:0 below that
+        return {"quality": quality, "optimize": True, "subsampling": 0 if quality >= 92 else 2}
+    return {"quality": quality, "method": 4}
+
+
+def _lossless_params(fmt: str, policy: EncodePolicy) -> dict:
+    if fmt == "PNG":
+        return {"compress_level": policy.png_compress_level}
+    return {"lossless": True, "method": 4}
+
+
+def setting_label(fmt: str, params: dict) -> str:
+    """Short name of an encoder setting, e.g. "jpeg_q92", "png_z4" or "webp_lossless"."""
+    if params.get("lossless"):
+        return f"{fmt.lower()}_lossless"
+    if "quality" in params:
+        return f"{fmt.lower()}_q{params['quality']}"
+    if "compress_level" in params:
+        return f"{fmt.lower()}_z{params['compress_level']}"
+    return fmt.lower()
+
+
+def encode_with_policy(img: Image.Image, model: Optional[str] = None,
+                       preferred_format: Optional[str] = None) -> Tuple[bytes, str]:
+    """
+    Encode img for model. preferred_format, if given and accepted by the
+    model, is used for photos instead of the policy's first choice.
+    """
+    policy = policy_for(model)
+    start = time.monotonic()
+    content = classify_content(img)
+    params = {}
+
+    if content in ("alpha", "graphic"):
+        fmt = policy.lossless_format()
+        params = _lossless_params(fmt, policy)
+        data_bytes = _save(img, fmt, **params)
+    else:
+        fmt = policy.lossy_format()
+        if preferred_format in policy.formats:
+            fmt = preferred_format
+        if fmt == "PNG":
+            params = _lossless_params(fmt, policy)
+            data_bytes = _save(img, fmt, **params)
+        else:
+            quality = policy.quality
+            params = _lossy_params(fmt, quality)
+            data_bytes = _save(img, fmt, **params)
+            while policy.byte_budget and len(data_bytes) > policy.byte_budget and quality > policy.min_quality:
+                quality = max(quality - 10, policy.min_quality)
+                params = _lossy_params(fmt, quality)
+                data_bytes = _save(img, fmt, **params)
+
+    encode_ms = int((time.monotonic() - start) * 1000)
+    label = setting_label(fmt, params)
+    metrics.incr(f"encoded_{fmt.lower()}_images")
+    metrics.incr("encoded_bytes", len(data_bytes))
+    metrics.incr("encode_ms", encode_ms)
+    # Per setting, so codecs and qualities can be compared with each other
+    metrics.incr(f"encoded_images:{label}")
+    metrics.incr(f"encoded_bytes:{label}", len(data_bytes))
+    metrics.incr(f"encode_ms:{label}", encode_ms)
+    return data_bytes, fmt
+
+
+def sniff_format(data_bytes: bytes) -> Optional[str]:
+    """Format of encoded image bytes from their magic bytes, "JPEG" or "PNG", else None."""
+    for signature, fmt in SIGNATURES:
+        if data_bytes.startswith(signature):
+            return fmt
+    return None
+
+
+def content_type_format(content_type: Optional[str]) -> Optional[str]:
+    """Format named by a Content-Type header, "JPEG" or "PNG", else None."""
+    if not content_type:
+        return None
+    return CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+
+
+def passthrough_format(data_bytes: bytes, content_type: Optional[str], model: Optional[str] = None) -> Optional[str]:
+    """
+    Format in which data_bytes can be sent to model as they are, or None if
+    they must be decoded and re-encoded: the Content-Type and the magic bytes
+    disagree, the format is not accepted, the bytes exceed the policy's byte
+    budget or the image exceeds the input cap. Only the image header is parsed.
+    """
+    fmt = sniff_format(data_bytes)
+    policy = policy_for(model)
+    if fmt is None or fmt != content_type_format(content_type) or fmt not in policy.formats:
+        return None
+    if policy.byte_budget and len(data_bytes) > policy.byte_budget:
+        return None
+    limit = limit_for(model)
+    if limit is not None:
+        try:
+            with Image.open(io.BytesIO(data_bytes)) as img:
+                size = img.size
+        except Exception:
+            return None
+        if target_size(size, limit) != size:
+            return None
+    metrics.incr("passthrough_images")
+    return fmt
+
+
+def benchmark_encoders(img: Image.Image, qualities=(95, 92, 90, 85, 80, 70),
+                       png_levels=(1, 4, 6, 9)) -> List[dict]:
+    """Encode img with each candidate setting and report bytes and time, smallest first."""
+    candidates = [("PNG", {"compress_level": level}) for level in png_levels]
+    candidates += [("WEBP", {"lossless": True, "method": 4})]
+    for quality in qualities:
+        candidates += [("JPEG", _lossy_params("JPEG", quality)), ("WEBP", _lossy_params("WEBP", quality))]
+
+    results = []
+    for fmt, params in candidates:
+        start = time.monotonic()
+        size = len(_save(img, fmt, **params))
+        results.append({"setting": setting_label(fmt, params), "format": fmt, "bytes": size,
+                        "ms": round((time.monotonic() - start) * 1000, 1)})
+    return sorted(results, key=lambda r: r["bytes"])
@@ -0,0 +1,49 @@
+"""
+Shared worker pool for CPU-bound image work (resize, encode, decode).
+
+PIL's resampling and encoders and zlib release the GIL, so running the inputs
+of a request on a few threads scales with the cores available. The pool is
+bounded by ENCODE_WORKERS in the [PERFORMANCE] section of config.ini and shared
+by every node, so concurrent prompts cannot oversubscribe the CPU.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List
+
+from .settings import get_int
+
+
+ENCODE_WORKERS = get_int("PERFORMANCE", "ENCODE_WORKERS", min(8, os.cpu_count() or 1))
+
+_executor = None
+_executor_lock = threading.Lock()
+_worker = threading.local()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(1, ENCODE_WORKERS),
+                                           thread_name_prefix="modelverse-encode",
+                                           initializer=_mark_worker)
+        return _executor
+
+
+def _mark_worker():
+    _worker.active = True
+
+
+def parallel_map(fn: Callable, items: Iterable) -> List:
+    """
+    fn applied to every item on the shared pool, results in input order.
+
+    An exception raised by fn is re-raised in the caller. Calls made from inside
+    a pool worker run inline, so nested use cannot deadlock the pool.
+    """
+    items = list(items)
+    if len(items) <= 1 or ENCODE_WORKERS <= 1 or getattr(_worker, "active", False):
+        return [fn(item) for item in items]
+    futures = [get_executor().submit(fn, item) for item in items]
+    return [future.result() for future in futures]
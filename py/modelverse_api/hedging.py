@@ -0,0 +1,129 @@
+"""
+Hedged requests against tail latency.
+
+A synchronous image request (/v1/images/generations or a Gemini
+generateContent call) that has not answered by the PERCENTILE latency of its
+model and images per call, counted from when it is sent, gets a duplicate;
+whichever answers first is used and the other is dropped (an HTTP call in
+flight cannot be recalled, its response is simply discarded). Duplicates are
+counted as hedged_requests and hedge_wins at /modelverse-metrics rather than
+logged one by one. Each hedgeable request earns BUDGET_PERCENT/100 of a
+duplicate, so duplicates never exceed that share of requests. Off by default,
+since a dropped duplicate may still be billed.
+
+    [HEDGING]
+    ENABLED = false
+    PERCENTILE = 95
+    BUDGET_PERCENT = 5
+    MIN_SAMPLES = 20   ; latencies needed before a model is hedged
+"""
+import contextvars
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+from .metrics import metrics
+from .settings import get_bool, get_float, get_int
+
+
+HEDGED_ENDPOINTS = ("/v1/images/generations",)
+HEDGED_SUFFIXES = (":generateContent",)
+# Unused budget is capped, so a quiet period cannot pay for a burst of duplicates
+MAX_BUDGET_TOKENS = 5.0
+# Hedged requests and their duplicates run on these threads
+MAX_WORKERS = 64
+WAIT_SLICE = 0.05
+# Event of the hedged request running in this context, set by mark_sent()
+_sent_event = contextvars.ContextVar("modelverse_hedge_sent", default=None)
+
+
+def mark_sent():
+    """Called by the client as a request goes out; starts a hedged request's deadline."""
+    event = _sent_event.get()
+    if event is not None:
+        event.set()
+
+
+def is_hedgeable(endpoint: str) -> bool:
+    return endpoint in HEDGED_ENDPOINTS or endpoint.endswith(HEDGED_SUFFIXES)
+
+
+class Hedger:
+
+    def __init__(self, enabled: bool = False, percentile: float = 95, budget_percent: float = 5,
+                 min_samples: int = 20):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.budget_ratio = budget_percent / 100.0
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._tokens = 0.0
+        self._executor = None
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            enabled=get_bool("HEDGING", "ENABLED", False),
+            percentile=get_float("HEDGING", "PERCENTILE", 95),
+            budget_percent=get_float("HEDGING", "BUDGET_PERCENT", 5),
+            min_samples=get_int("HEDGING", "MIN_SAMPLES", 20),
+        )
+
+    def deadline(self, model: Optional[str], n: Optional[int] = None) -> Optional[float]:
+        """Seconds after which a request of model for n images is hedged, None if it is not."""
+        if not model or len(metrics.latencies(model, n)) < self.min_samples:
+            return None
+        return metrics.percentile(model, self.percentile, n)
+
+    def run(self, endpoint: str, model: Optional[str], send: Callable, n: Optional[int] = None):
+        """send(), duplicated if it has not returned by the deadline of model and n."""
+        deadline = self.deadline(model, n) if self.enabled and is_hedgeable(endpoint) else None
+        if deadline is None:
+            return send()
+        with self._lock:
+            self._tokens = min(self._tokens + self.budget_ratio, MAX_BUDGET_TOKENS)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="modelverse-hedge")
+
+        primary, sent = self._submit(send)
+        # Time queued for a worker or a concurrency slot does not count
+        while not sent.wait(WAIT_SLICE) and not primary.done():
+            pass
+        done, _ = wait([primary], timeout=deadline)
+        if done or not self._take_token():
+            return primary.result()
+
+        metrics.incr("hedged_requests")
+        backup, _ = self._submit(send)
+        pending = {primary, backup}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        metrics.incr("hedge_wins")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _submit(self, send: Callable):
+        """(future of send(), event set once its request is sent)"""
+        sent = threading.Event()
+
+        def run():
+            _sent_event.set(sent)
+            return send()
+
+        # Carry the caller's context (e.g. merging settings) into the worker thread
+        return self._executor.submit(contextvars.copy_context().run, run), sent
+
+    def _take_token(self) -> bool:
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+
+hedger = Hedger.from_settings()
@@ -0,0 +1,209 @@
+"""
+Local HTTP cache for input images fetched by URL.
+
+Bodies are stored on disk in the plugin's image_cache folder, keyed by URL,
+together with their ETag and Last-Modified. A cached URL is revalidated with
+a conditional GET on every use, so an unchanged image costs a 304 instead of
+a download; a body sent with Cache-Control max-age is reused without a
+request until it expires. Bodies with neither a validator nor a max-age are
+not stored, since they could never be checked. Least recently used bodies
+are evicted beyond MAX_MB.
+
+Decoded forms of a body (PIL images from utils.load_image, request-ready
+encodings such as Veo's) are kept in a small in-memory tier keyed by the
+body's SHA-256 and a kind, so an unchanged image is not decoded again either.
+
+    [CACHE]
+    ENABLED = true
+    MAX_MB = 512
+    MEMORY_ITEMS = 32
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+import requests
+
+from .metrics import metrics
+from .settings import PLUGIN_DIR, get_bool, get_int
+
+
+CACHE_DIR = os.path.join(PLUGIN_DIR, "image_cache")
+FETCH_TIMEOUT = 60
+MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class HttpCache:
+
+    def __init__(self, directory: str, max_bytes: int, memory_items: int = 32, enabled: bool = True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # (sha256 of the body, kind) -> decoded value
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            CACHE_DIR,
+            max_bytes=get_int("CACHE", "MAX_MB", 512) * 1024 * 1024,
+            memory_items=get_int("CACHE", "MEMORY_ITEMS", 32),
+            enabled=get_bool("CACHE", "ENABLED", True),
+        )
+
+    def fetch(self, url: str) -> Tuple[bytes, Optional[str]]:
+        """Body and Content-Type of url, from the cache if the server says it is unchanged."""
+        body, meta = self._fetch(url)
+        return body, meta.get("content_type")
+
+    def decoded(self, url: str, kind, decode: Callable[[bytes, Optional[str]], object]):
+        """
+        decode(body, content_type) of url's current body, cached in memory per
+        kind. The body is still revalidated, so a changed image is decoded anew.
+        """
+        body, meta = self._fetch(url)
+        return self.memoized(meta["sha256"], kind, lambda: decode(body, meta.get("content_type")))
+
+    def memoized(self, digest: str, kind, make: Callable[[], object]):
+        """make() for the body with SHA-256 digest, cached in memory per kind."""
+        key = (digest, kind)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                metrics.incr("image_cache_memory_hits")
+                return self._memory[key]
+        value = make()
+        with self._lock:
+            self._memory[key] = value
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+        return value
+
+    def _fetch(self, url: str) -> Tuple[bytes, dict]:
+        if not self.enabled:
+            return self._download(url)
+        body_path, meta_path = self._paths(url)
+        meta = self._read_meta(meta_path)
+        cached = meta is not None and os.path.exists(body_path)
+        if cached and time.time() < meta.get("expires", 0):
+            return self._hit(body_path, meta_path, meta)
+        headers = {}
+        if cached and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if cached and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            response = requests.get(url, headers=headers, timeout=FETCH_TIMEOUT)
+        except requests.RequestException as e:
+            if not cached:
+                raise
+            print("WARN:", f"Cannot revalidate {url} ({e}), using the cached copy.")
+            return self._hit(body_path, meta_path, meta)
+        if response.status_code == 304 and cached:
+            return self._hit(body_path, meta_path, meta)
+        response.raise_for_status()
+        metrics.incr("image_cache_misses")
+
+        body = response.content
+        meta = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_type": response.headers.get("Content-Type"),
+            "sha256": hashlib.sha256(body).hexdigest(),
+            "size": len(body),
+        }
+        cache_control = response.headers.get("Cache-Control", "")
+        max_age = MAX_AGE.search(cache_control)
+        if max_age:
+            meta["expires"] = time.time() + int(max_age.group(1))
+        storable = meta["etag"] or meta["last_modified"] or meta.get("expires")
+        if storable and "no-store" not in cache_control:
+            self._store(body_path, meta_path, body, meta)
+        return body, meta
+
+    @staticmethod
+    def _download(url: str) -> Tuple[bytes, dict]:
+        response = requests.get(url, timeout=FETCH_TIMEOUT)
+        response.raise_for_status()
+        return response.content, {"content_type": response.headers.get("Content-Type"),
+                                  "sha256": hashlib.sha256(response.content).hexdigest()}
+
+    def _hit(self, body_path: str, meta_path: str, meta: dict) -> Tuple[bytes, dict]:
+        with open(body_path, "rb") as f:
+            body = f.read()
+        metrics.incr("image_cache_hits")
+        metrics.incr("image_cache_bytes_saved", len(body))
+        # The modification time of the metadata file orders eviction
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+        return body, meta
+
+    def _paths(self, url: str) -> Tuple[str, str]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key), os.path.join(self.directory, key + ".json")
+
+    @staticmethod
+    def _read_meta(meta_path: str) -> Optional[dict]:
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, body_path: str, meta_path: str, body: bytes, meta: dict):
+        if len(body) > self.max_bytes:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write then rename, so concurrent readers never see a partial file
+            suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(body_path + suffix, "wb") as f:
+                f.write(body)
+            os.replace(body_path + suffix, body_path)
+            with open(meta_path + suffix, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(meta_path + suffix, meta_path)
+        except OSError as e:
+            print("WARN:", f"Cannot write image cache: {e}")
+            return
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        total = 0
+        with self._lock:
+            for name in os.listdir(self.directory):
+                if not name.endswith(".json"):
+                    continue
+                meta_path = os.path.join(self.directory, name)
+                body_path = meta_path[:-len(".json")]
+                try:
+                    size = os.path.getsize(body_path)
+                    used = os.path.getmtime(meta_path)
+                except OSError:
+                    continue
+                entries.append((used, size, body_path, meta_path))
+                total += size
+            for used, size, body_path, meta_path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                for path in (body_path, meta_path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                total -= size
+                metrics.incr("image_cache_evictions")
+
+
+image_cache = HttpCache.from_settings()
@@ -0,0 +1,77 @@
+"""
+Per-model input resolution caps.
+
+Each model downsamples its inputs server-side, so anything above these caps is
+encoded, uploaded and decoded for nothing. Inputs are shrunk to the cap with a
+Lanczos filter before encoding; the saving is recorded in the client metrics.
+"""
+from typing import Optional, Tuple
+
+from PIL import Image
+
+from .metrics import metrics
+
+
+# model -> (max side in pixels, max pixel count)
+MODEL_INPUT_LIMITS = {
+    "black-forest-labs/flux.1-dev": (1536, 1536 * 1536),
+    "black-forest-labs/flux-kontext-pro": (2048, 2048 * 2048),
+    "black-forest-labs/flux-kontext-pro/multi": (2048, 2048 * 2048),
+    "black-forest-labs/flux-kontext-max": (2048, 2048 * 2048),
+    "black-forest-labs/flux-kontext-max/multi": (2048, 2048 * 2048),
+    "Qwen/Qwen-Image-Edit": (2048, 2048 * 2048),
+    "stepfun-ai/step1x-edit": (2048, 2048 * 2048),
+    "gpt-image-1": (2048, 2048 * 2048),
+    "gemini-2.5-flash-image": (2048, 2048 * 2048),
+    "gemini-3.1-flash-image": (2048, 2048 * 2048),
+    "gemini-3-pro-image": (4096, 4096 * 4096),
+    "kling-v3": (3840, 3840 * 2160),
+    "kling-v3-omni": (3840, 3840 * 2160),
+    "doubao-seedance-2-0-260128": (3840, 3840 * 2160),
+    "veo-3.1-generate-001": (3840, 3840 * 2160),
+    "veo-3.1-fast-generate-001": (3840, 3840 * 2160),
+    "happyhorse-1.0-i2v": (2560, 2560 * 1440),
+    "happyhorse-1.0-r2v": (2560, 2560 * 1440),
+    "openai/sora-2/image-to-video": (1920, 1920 * 1080),
+    "openai/sora-2/image-to-video-pro": (1920, 1920 * 1080),
+    "Wan-AI/Wan2.2-I2V": (1920, 1920 * 1080),
+}
+
+# Vidu model names share one cap
+VIDU_INPUT_LIMIT = (2560, 2560 * 1440)
+
+
+def limit_for(model: Optional[str]) -> Optional[Tuple[int, int]]:
+    if not model:
+        return None
+    if model in MODEL_INPUT_LIMITS:
+        return MODEL_INPUT_LIMITS[model]
+    if model.startswith("vidu"):
+        return VIDU_INPUT_LIMIT
+    return None
+
+
+def target_size(size: Tuple[int, int], limit: Tuple[int, int]) -> Tuple[int, int]:
+    """Largest size with the same aspect ratio that fits within limit."""
+    width, height = size
+    max_side, max_pixels = limit
+    scale = min(1.0, max_side / max(width, height), (max_pixels / float(width * height)) ** 0.5)
+    if scale >= 1.0:
+        return size
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def fit_to_model(img: Image.Image, model: Optional[str]) -> Image.Image:
+    """Shrink img to the input cap of model, if it has one and img exceeds it."""
+    limit = limit_for(model)
+    if limit is None:
+        return img
+    size = target_size(img.size, limit)
+    if size == img.size:
+        return img
+    # reducing_gap lets Pillow pre-shrink with a cheap box filter on huge inputs
+    resized = img.resize(size, Image.LANCZOS, reducing_gap=3.0)
+    metrics.incr("downscaled_images")
+    metrics.incr("downscaled_pixels_saved", img.size[0] * img.size[1] - size[0] * size[1])
+    print("INFO:", f"Downscaled input {img.size[0]}x{img.size[1]} -> {size[0]}x{size[1]} for {model}.")
+    return resized
@@ -0,0 +1,165 @@
+"""
+Streaming parser for JSON responses carrying large base64 payloads.
+
+Gemini image responses put each output image in an "inlineData": {"data": ...}
+string. Reading them with response.json() holds the raw body, the decoded
+string, the base64-decoded bytes and the image at the same time. This parser
+reads the body chunk by chunk instead: every inlineData.data string is
+base64-decoded as it streams in, into a BytesIO that replaces the string in
+the parsed result. Everything else is collected and parsed with json as usual,
+so the returned structure is the same apart from those buffers.
+"""
+import base64
+import io
+import json
+from typing import Iterable, List
+
+
+CHUNK_SIZE = 1 << 16
+INLINE_CONTAINER = b"inlineData"
+INLINE_KEY = b"data"
+BLOB_MARKER = "__modelverse_inline_blob__"
+MAX_KEY_LENGTH = 64
+WHITESPACE = b" \t\r\n"
+
+
+class InlineDataParser:
+    """Incremental parser; feed() raw body chunks, then call result()."""
+
+    def __init__(self):
+        self.blobs: List[io.BytesIO] = []
+        self._skeleton = bytearray()
+        self._stack = []            # key of each open container, None inside arrays
+        self._in_string = False
+        self._escape = False
+        self._string = bytearray()  # contents of the current string while it may be a key
+        self._last_string = None    # last short string closed, a key if ':' follows
+        self._pending_key = None    # key whose value comes next
+        self._blob = None           # BytesIO being filled while inside inline data
+        self._b64 = bytearray()     # base64 received but not decoded yet, under 4 bytes between chunks
+
+    def feed(self, chunk: bytes):
+        pos, end = 0, len(chunk)
+        while pos < end:
+            if self._blob is not None:
+                pos = self._feed_blob(chunk, pos)
+            elif self._in_string:
+                pos = self._feed_string(chunk, pos)
+            else:
+                pos = self._feed_structure(chunk, pos)
+
+    def _feed_structure(self, chunk: bytes, pos: int) -> int:
+        byte = chunk[pos]
+        if byte in WHITESPACE:
+            return pos + 1
+        if byte == 0x22:  # '"'
+            if self._pending_key == INLINE_KEY and self._stack and self._stack[-1] == INLINE_CONTAINER:
+                self._pending_key = None
+                self._start_blob()
+                return pos + 1
+            self._in_string = True
+            self._string = bytearray()
+            self._skeleton.append(byte)
+            return pos + 1
+        if byte == 0x3A:  # ':'
+            self._pending_key = self._last_string
+        elif byte in (0x7B, 0x5B):  # '{' '['
+            self._stack.append(self._pending_key if byte == 0x7B else None)
+            self._pending_key = None
+        elif byte in (0x7D, 0x5D):  # '}' ']'
+            if self._stack:
+                self._stack.pop()
+            self._pending_key = None
+        elif byte == 0x2C:  # ','
+            self._pending_key = None
+        self._last_string = None
+        self._skeleton.append(byte)
+        return pos + 1
+
+    def _feed_string(self, chunk: bytes, pos: int) -> int:
+        if self._escape:
+            self._escape = False
+            self._skeleton.append(chunk[pos])
+            self._append_key_bytes(chunk[pos:pos + 1])
+            return pos + 1
+        # Copy up to the next quote or backslash in one go
+        quote = chunk.find(b'"', pos)
+        backslash = chunk.find(b"\\", pos, quote if quote != -1 else len(chunk))
+        stop = backslash if backslash != -1 else quote
+        if stop == -1:
+            self._skeleton += chunk[pos:]
+            self._append_key_bytes(chunk[pos:])
+            return len(chunk)
+        self._skeleton += chunk[pos:stop + 1]
+        self._append_key_bytes(chunk[pos:stop])
+        if stop == backslash:
+            self._escape = True
+        else:
+            self._in_string = False
+            self._last_string = bytes(self._string) if self._string is not None else None
+        return stop + 1
+
+    def _append_key_bytes(self, data: bytes):
+        if self._string is None:
+            return
+        self._string += data
+        if len(self._string) > MAX_KEY_LENGTH:
+            self._string = None
+
+    def _start_blob(self):
+        self._blob = io.BytesIO()
+        self._b64 = bytearray()
+        self._skeleton += json.dumps({BLOB_MARKER: len(self.blobs)}).encode("utf-8")
+        self.blobs.append(self._blob)
+
+    def _feed_blob(self, chunk: bytes, pos: int) -> int:
+        quote = chunk.find(b'"', pos)
+        stop = quote if quote != -1 else len(chunk)
+        self._b64 += chunk[pos:stop]
+        if quote == -1:
+            self._decode_b64(final=False)
+            return stop
+        self._decode_b64(final=True)
+        self._blob.seek(0)
+        self._blob = None
+        self._last_string = None
+        return quote + 1
+
+    def _decode_b64(self, final: bool):
+        # Base64 has no quotes; the only escapes encoders emit in it are \/ and line breaks.
+        # A backslash at the end of a chunk waits for the character it escapes.
+        carry = b""
+        if b"\\" in self._b64:
+            if not final and self._b64.endswith(b"\\"):
+                carry = b"\\"
+                del self._b64[-1:]
+            self._b64 = bytearray(self._b64.replace(b"\\/", b"/").replace(b"\\n", b"").replace(b"\\r", b""))
+        usable = len(self._b64) if final else len(self._b64) // 4 * 4
+        if usable:
+            self._blob.write(base64.b64decode(bytes(self._b64[:usable])))
+            del self._b64[:usable]
+        self._b64 += carry
+
+    def result(self):
+        if self._blob is not None or self._in_string:
+            raise ValueError("Truncated JSON response")
+        return json.loads(bytes(self._skeleton), object_hook=self._restore_blob)
+
+    def _restore_blob(self, obj):
+        if len(obj) == 1 and BLOB_MARKER in obj:
+            return self.blobs[obj[BLOB_MARKER]]
+        return obj
+
+
+def parse_inline_data(chunks: Iterable[bytes]):
+    """Parse a JSON body from byte chunks, with inlineData.data as BytesIO buffers."""
+    parser = InlineDataParser()
+    for chunk in chunks:
+        if chunk:
+            parser.feed(chunk)
+    return parser.result()
+
+
+def parse_response(response):
+    """parse_inline_data over a streamed requests.Response."""
+    return parse_inline_data(response.iter_content(chunk_size=CHUNK_SIZE))
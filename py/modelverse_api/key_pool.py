@@ -0,0 +1,249 @@
+"""
+Load balancing across several Modelverse API keys.
+
+A KeyPool spreads requests over a set of keys taken from secrets.json, keeps
+per-key rate limits as a hard ceiling and quarantines keys that are rejected
+(401) or out of quota so they stop receiving traffic for a while.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Optional
+
+
+STRATEGIES = ["least_in_flight", "rate_budget"]
+
+# Seconds a key is taken out of rotation after an auth or quota failure
+QUARANTINE_SECONDS = 600
+# Fallback cooldown after a plain 429 without a Retry-After header
+RATE_LIMIT_COOLDOWN = 30
+# Seconds an x-ratelimit-remaining-requests value holds without x-ratelimit-reset-requests
+REMAINING_WINDOW = 60
+# Task ids whose key is remembered for status queries; the oldest are forgotten first
+MAX_PINNED_TASKS = 10000
+# Longest wait for rate budget between two checks of the caller's check()
+WAIT_SLICE = 0.25
+
+# API errors that say the account is out of quota or balance
+QUOTA_MARKERS = ("quota", "insufficient", "balance")
+
+
+class KeyState:
+    """Bookkeeping for a single API key in a pool."""
+
+    def __init__(self, name: str, api_key: str):
+        self.name = name
+        self.api_key = api_key
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.quarantined_until = 0.0
+        self.last_error = None
+        self.remaining = None  # from x-ratelimit-remaining-requests, if sent
+        self.remaining_until = 0.0  # when that value no longer holds
+        self.sent_at = deque()  # send timestamps inside the last minute
+
+    def is_quarantined(self, now: float) -> bool:
+        return self.quarantined_until > now
+
+    def budget(self, now: float, rate_limit: int) -> float:
+        """Requests this key may still send in the current one-minute window."""
+        while self.sent_at and now - self.sent_at[0] >= 60:
+            self.sent_at.popleft()
+        if self.remaining is not None and now >= self.remaining_until:
+            self.remaining = None
+        budget = float("inf")
+        if rate_limit:
+            budget = rate_limit - len(self.sent_at)
+        if self.remaining is not None:
+            budget = min(budget, self.remaining)
+        return budget
+
+    def budget_refill(self, now: float) -> float:
+        """Seconds until this key's budget next grows."""
+        waits = [60 - (now - self.sent_at[0])] if self.sent_at else []
+        if self.remaining is not None:
+            waits.append(self.remaining_until - now)
+        return min(waits, default=1.0)
+
+
+class KeyPool:
+    """
+    A set of API keys shared by ModelverseClient. Each request gets the key
+    with the fewest requests in flight ("least_in_flight") or the most budget
+    left in the current minute ("rate_budget").
+
+    Args:
+        keys: mapping of secret name -> API key
+        strategy: "least_in_flight" or "rate_budget"
+        rate_limit: requests per minute allowed per key, 0 for unlimited
+    """
+
+    def __init__(self, keys: Dict[str, str], strategy: str = "least_in_flight", rate_limit: int = 0):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown key pool strategy: {strategy}")
+        self.strategy = strategy
+        self.rate_limit = rate_limit
+        self._cond = threading.Condition()
+        self._states: Dict[str, KeyState] = {}
+        self._task_keys: Dict[str, str] = OrderedDict()
+        self.update_keys(keys)
+
+    @property
+    def names(self):
+        return list(self._states)
+
+    def update_keys(self, keys: Dict[str, str]):
+        """Replace the key values while keeping usage of names that stay."""
+        if not keys:
+            raise ValueError("A key pool needs at least one API key")
+        with self._cond:
+            states = {}
+            for name, api_key in keys.items():
+                state = self._states.get(name)
+                if state is None or state.api_key != api_key:
+                    state = KeyState(name, api_key)
+                states[name] = state
+            self._states = states
+            self._cond.notify_all()
+
+    def acquire(self, task_id: Optional[str] = None, check: Optional[Callable] = None) -> KeyState:
+        """
+        Pick a key for the next request and mark it in flight.
+
+        Requests about an existing task are pinned to the key that submitted it,
+        since task ids are only visible to the account that created them.
+        check(), e.g. an interrupt check, runs while waiting for rate budget.
+        """
+        with self._cond:
+            if task_id is not None and task_id in self._task_keys:
+                state = self._states.get(self._task_keys[task_id])
+                if state is not None:
+                    return self._mark_sent(state, time.time())
+
+            while True:
+                now = time.time()
+                candidates = [s for s in self._states.values() if not s.is_quarantined(now)]
+                if not candidates:
+                    raise Exception("All API keys in the pool are quarantined: " + ", ".join(
+                        f"{s.name} ({s.last_error})" for s in self._states.values()))
+
+                with_budget = [s for s in candidates if s.budget(now, self.rate_limit) > 0]
+                if with_budget:
+                    return self._mark_sent(self._select(with_budget, now), now)
+
+                # Every usable key is at its rate limit; wait for the first budget to refill.
+                wait = min(s.budget_refill(now) for s in candidates)
+                if check is not None:
+                    check()
+                self._cond.wait(timeout=min(max(wait, 0.05), WAIT_SLICE))
+
+    def _select(self, candidates, now: float) -> KeyState:
+        if self.strategy == "rate_budget":
+            return max(candidates, key=lambda s: (s.budget(now, self.rate_limit), -s.in_flight, -s.requests))
+        return min(candidates, key=lambda s: (s.in_flight, s.requests))
+
+    def _mark_sent(self, state: KeyState, now: float) -> KeyState:
+        state.in_flight += 1
+        state.requests += 1
+        state.sent_at.append(now)
+        if state.remaining is not None:
+            state.remaining -= 1
+        return state
+
+    def release(self, state: KeyState, status_code: Optional[int] = None, headers=None, error: Optional[Exception] = None):
+        """Return a key to the pool, quarantining it on auth or quota failures."""
+        with self._cond:
+            state.in_flight = max(state.in_flight - 1, 0)
+            if headers is not None:
+                remaining = headers.get("x-ratelimit-remaining-requests")
+                if remaining is not None:
+                    try:
+                        state.remaining = int(remaining)
+                    except ValueError:
+                        pass
+                    else:
+                        reset = _seconds(headers.get("x-ratelimit-reset-requests"))
+                        state.remaining_until = time.time() + (reset if reset is not None else REMAINING_WINDOW)
+            if error is not None:
+                state.errors += 1
+                state.last_error = str(error)
+                cooldown = self._cooldown(status_code, str(error), headers)
+                if cooldown:
+                    state.quarantined_until = time.time() + cooldown
+                    print("WARN:", f"API key '{state.name}' quarantined for {int(cooldown)}s: {error}")
+            self._cond.notify_all()
+
+    def _cooldown(self, status_code, message, headers) -> float:
+        # Transport errors (timeouts, dropped connections) say nothing about the key
+        if status_code is None:
+            return 0
+        if status_code == 429:
+            retry_after = _seconds(headers.get("retry-after") if headers is not None else None)
+            return retry_after if retry_after else RATE_LIMIT_COOLDOWN
+        if status_code in (401, 402):
+            return QUARANTINE_SECONDS
+        if any(marker in message.lower() for marker in QUOTA_MARKERS):
+            return QUARANTINE_SECONDS
+        return 0
+
+    def pin_task(self, task_id: str, state: KeyState):
+        with self._cond:
+            self._task_keys[task_id] = state.name
+            self._task_keys.move_to_end(task_id)
+            while len(self._task_keys) > MAX_PINNED_TASKS:
+                self._task_keys.popitem(last=False)
+
+    def usage(self) -> Dict[str, dict]:
+        """Per-key usage, without exposing the key values."""
+        now = time.time()
+        with self._cond:
+            return {
+                s.name: {
+                    "requests": s.requests,
+                    "errors": s.errors,
+                    "in_flight": s.in_flight,
+                    "sent_last_minute": len(s.sent_at),
+                    "remaining": s.remaining,
+                    "quarantined_for": max(int(s.quarantined_until - now), 0),
+                    "last_error": s.last_error,
+                }
+                for s in self._states.values()
+            }
+
+
+def _seconds(value) -> Optional[float]:
+    """Seconds in a header value such as "30", "1.5" or "1m30s", None if unreadable."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|s|m|h)", str(value))
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+_pools: Dict[tuple, KeyPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_key_pool(keys: Dict[str, str], strategy: str = "least_in_flight", rate_limit: int = 0) -> KeyPool:
+    """Return the pool for this set of secret names, reusing it across prompts."""
+    pool_id = (tuple(sorted(keys)), strategy, rate_limit)
+    with _pools_lock:
+        pool = _pools.get(pool_id)
+        if pool is None:
+            pool = _pools[pool_id] = KeyPool(keys, strategy, rate_limit)
+        else:
+            pool.update_keys(keys)
+        return pool
+
+
+def key_pool_usage() -> Dict[str, dict]:
+    with _pools_lock:
+        return {",".join(pool_id[0]): pool.usage() for pool_id, pool in _pools.items()}
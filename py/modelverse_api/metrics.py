@@ -0,0 +1,82 @@
+"""
+Process-wide request metrics for the Modelverse client.
+
+Counters are kept per endpoint and latencies per model (and per model and
+images per call, for the planner), so that nodes and shared clients across
+prompts all feed the same statistics.
+"""
+import threading
+from collections import defaultdict, deque
+from typing import Dict, List, Optional
+
+
+LATENCY_SAMPLES = 200
+
+
+class RequestMetrics:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = defaultdict(lambda: {"calls": 0, "errors": 0, "seconds": 0.0})
+        self._latencies: Dict[str, deque] = defaultdict(lambda: deque(maxlen=LATENCY_SAMPLES))
+        self._latencies_by_n: Dict[tuple, deque] = defaultdict(lambda: deque(maxlen=LATENCY_SAMPLES))
+        self._counters = defaultdict(int)
+        self._gauges = {}
+
+    def record(self, endpoint: str, model: Optional[str], seconds: float, ok: bool, n: Optional[int] = None):
+        with self._lock:
+            stats = self._endpoints[endpoint]
+            stats["calls"] += 1
+            stats["seconds"] += seconds
+            if not ok:
+                stats["errors"] += 1
+            elif model:
+                self._latencies[model].append(seconds)
+                if n:
+                    self._latencies_by_n[(model, n)].append(seconds)
+
+    def incr(self, name: str, value: int = 1):
+        """Bump a free-form counter, e.g. bytes saved by an optimisation."""
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value):
+        """Set a current value, e.g. a concurrency window."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def latencies(self, model: str, n: Optional[int] = None) -> List[float]:
+        """Latencies of model's calls, only those of n images per call if n is given."""
+        with self._lock:
+            if n:
+                return list(self._latencies_by_n.get((model, n), ()))
+            return list(self._latencies.get(model, ()))
+
+    def median_by_n(self, model: str) -> Dict[int, float]:
+        """Median latency of model's calls per number of images per call."""
+        with self._lock:
+            samples = {n: sorted(values) for (m, n), values in self._latencies_by_n.items() if m == model and values}
+        return {n: values[len(values) // 2] for n, values in samples.items()}
+
+    def percentile(self, model: str, pct: float, n: Optional[int] = None) -> Optional[float]:
+        samples = sorted(self.latencies(model, n))
+        if not samples:
+            return None
+        index = min(int(len(samples) * pct / 100.0), len(samples) - 1)
+        return samples[index]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            endpoints = {
+                endpoint: {**stats, "avg_seconds": stats["seconds"] / stats["calls"] if stats["calls"] else 0.0}
+                for endpoint, stats in self._endpoints.items()
+            }
+            models = {
+                model: {"samples": len(samples), "avg_seconds": sum(samples) / len(samples)}
+                for model, samples in self._latencies.items() if samples
+            }
+            return {"endpoints": endpoints, "models": models, "counters": dict(self._counters),
+                    "gauges": dict(self._gauges)}
+
+
+metrics = RequestMetrics()
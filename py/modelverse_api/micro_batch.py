@@ -0,0 +1,139 @@
+"""
+Micro-batching of compatible image generation requests.
+
+Flux Dev, Qwen-Image and gpt-image-1 generate up to 4 images per call (n).
+Requests for the same model and parameters that arrive within a few
+milliseconds of each other, from separate prompts, nodes or num_requests,
+are merged into one call with n set to their sum, and the returned images are
+split back out in order. Only requests whose seed is random (-1) or that have
+no seed are merged, since n images from one explicit seed, 0 included, are
+not the images the separate seeds would give. A request waits for partners
+only while another request with the same parameters is in flight, so a lone
+request is sent at once.
+
+    [BATCHING]
+    WINDOW_MS = 20   ; how long a request waits for partners, 0 disables merging
+"""
+import contextvars
+import hashlib
+import json
+import threading
+from collections import defaultdict
+from concurrent.futures import Future
+from typing import Callable, Optional, Tuple
+
+from .metrics import metrics
+from .settings import get_int
+
+
+MERGE_ENDPOINT = "/v1/images/generations"
+# model -> most images the API returns per call
+MAX_IMAGES_PER_CALL = {
+    "black-forest-labs/flux.1-dev": 4,
+    "Qwen/Qwen-Image": 4,
+    "gpt-image-1": 4,
+}
+# The only seed value that asks for a random seed
+RANDOM_SEED = -1
+WINDOW_MS = get_int("BATCHING", "WINDOW_MS", 20)
+# False while sending requests whose split into calls was planned on purpose
+merging_enabled = contextvars.ContextVar("modelverse_merging_enabled", default=True)
+
+
+def merge_key(endpoint: str, payload) -> Optional[Tuple[str, int, int]]:
+    """(key, n, max n) of a mergeable request, None if it must be sent alone."""
+    if endpoint != MERGE_ENDPOINT or not isinstance(payload, dict):
+        return None
+    max_n = MAX_IMAGES_PER_CALL.get(payload.get("model"))
+    n = payload.get("n", 1)
+    if max_n is None or not isinstance(n, int) or n >= max_n:
+        return None
+    if "seed" in payload and payload["seed"] != RANDOM_SEED:
+        return None
+    rest = {k: v for k, v in payload.items() if k not in ("n", "seed")}
+    body = json.dumps(rest, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest(), n, max_n
+
+
+class _Group:
+
+    def __init__(self, n: int):
+        self.counts = [n]
+        self.full = threading.Event()
+        self.result = Future()
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts)
+
+
+class MicroBatcher:
+
+    def __init__(self, window_ms: int = WINDOW_MS):
+        self.window = window_ms / 1000.0
+        self._lock = threading.Lock()
+        self._open = {}  # merge key -> group still accepting requests
+        self._in_flight = defaultdict(int)  # merge key -> requests being sent or waiting
+
+    def run(self, endpoint: str, payload, send: Callable):
+        """send(payload), possibly as part of one call merged with concurrent compatible requests."""
+        merge = merge_key(endpoint, payload) if self.window > 0 and merging_enabled.get() else None
+        if merge is None:
+            return send(payload)
+        key, n, max_n = merge
+
+        with self._lock:
+            group = self._open.get(key)
+            if group is not None and group.total + n <= max_n:
+                index = len(group.counts)
+                group.counts.append(n)
+                if group.total >= max_n:
+                    del self._open[key]
+                    group.full.set()
+            elif self._in_flight[key]:
+                group = self._open[key] = _Group(n)
+                index = 0
+            else:
+                # Nothing to merge with: no reason to wait
+                group, index = None, 0
+            self._in_flight[key] += 1
+        try:
+            if group is None:
+                return send(payload)
+            return self._run_group(key, group, index, payload, send)
+        finally:
+            with self._lock:
+                self._in_flight[key] -= 1
+                if not self._in_flight[key]:
+                    del self._in_flight[key]
+
+    def _run_group(self, key: str, group: _Group, index: int, payload, send: Callable):
+        if index > 0:
+            return self._share(group.result.result(), group.counts, index)
+
+        # The first request of a group waits for partners, then sends for all
+        group.full.wait(self.window)
+        with self._lock:
+            if self._open.get(key) is group:
+                del self._open[key]
+        if len(group.counts) == 1:
+            group.result.set_result(None)
+            return send(payload)
+
+        metrics.incr("merged_requests", len(group.counts) - 1)
+        print("INFO:", f"Merged {len(group.counts)} compatible requests into one call of {group.total} images.")
+        try:
+            response = send({**payload, "n": group.total})
+        except BaseException as e:
+            group.result.set_exception(e)
+            raise
+        group.result.set_result(response)
+        return self._share(response, group.counts, 0)
+
+    @staticmethod
+    def _share(response, counts, index: int):
+        """The images of request index out of a merged response."""
+        if not isinstance(response, dict) or not isinstance(response.get("data"), list):
+            return response
+        start = sum(counts[:index])
+        return {**response, "data": response["data"][start:start + counts[index]]}
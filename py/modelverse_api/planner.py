@@ -0,0 +1,80 @@
+"""
+Planning of images per call (n) versus parallel calls.
+
+For a total number of images, the fastest mix depends on how a model's
+latency grows with n, which is measured here rather than guessed: every call
+records its latency per model and n (see metrics.py). A call is modelled as
+latency(n) = overhead + per_image * n, fitted on the measured medians, and
+the plan with the lowest estimated wall time wins. Planned batches are run
+with at most MAX_PARALLEL calls in flight (run_tasks(max_parallel=...)), so
+calls beyond it really do run in further waves, as estimated. Ties go to
+fewer calls, which use fewer rate-limit tokens. Without measurements, calls
+are spread as wide as allowed. The wave width is also bounded by the free
+slots of the client's adaptive concurrency window (see concurrency.py),
+which shrinks on 429s and Retry-After.
+
+    [PLANNER]
+    MAX_PARALLEL = 4   ; most calls of one node in flight at once
+"""
+import math
+from typing import Dict, List, Optional, Tuple
+
+from .metrics import metrics
+from .settings import get_int
+
+
+MAX_PARALLEL = get_int("PLANNER", "MAX_PARALLEL", 4)
+TOTAL_IMAGES_TOOLTIP = ("Auto mode: total number of images, split into images per request and parallel "
+                        "requests from measured latencies. 0 uses num_images and num_requests.")
+# Share of a call's latency assumed to be fixed overhead when only one n was measured
+DEFAULT_OVERHEAD_SHARE = 0.5
+
+
+def latency_model(medians: Dict[int, float]) -> Optional[Tuple[float, float]]:
+    """(overhead, per_image) seconds fitted to measured medians per n, None without data."""
+    if not medians:
+        return None
+    if len(medians) == 1:
+        (n, latency), = medians.items()
+        overhead = latency * DEFAULT_OVERHEAD_SHARE
+        return overhead, (latency - overhead) / n
+    # Least squares line through (n, latency)
+    xs, ys = list(medians), list(medians.values())
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sum((x - mean_x) ** 2 for x in xs)
+    slope = max(slope, 0.0)
+    return max(mean_y - slope * mean_x, 0.0), slope
+
+
+def split(total: int, calls: int) -> List[int]:
+    """total images over calls as evenly as possible, larger calls first."""
+    base, extra = divmod(total, calls)
+    return [base + 1] * extra + [base] * (calls - extra)
+
+
+def estimate(counts: List[int], model: Tuple[float, float], max_parallel: int) -> float:
+    overhead, per_image = model
+    waves = [counts[i:i + max_parallel] for i in range(0, len(counts), max_parallel)]
+    return sum(overhead + per_image * max(wave) for wave in waves)
+
+
+def plan_images(model_name: str, total: int, max_n: int = 4, max_parallel: int = MAX_PARALLEL,
+                limiter=None) -> List[int]:
+    """Images per call for total images of model_name; one entry per call."""
+    total = max(int(total), 1)
+    available = limiter.available(model_name) if limiter is not None else None
+    if available is not None:
+        max_parallel = min(max_parallel, available)
+    max_parallel = max(int(max_parallel), 1)
+    min_calls = math.ceil(total / max_n)
+    candidates = [split(total, calls) for calls in range(min_calls, total + 1)]
+
+    model = latency_model(metrics.median_by_n(model_name))
+    if model is None:
+        # Nothing measured yet: as many parallel calls as allowed, no waves
+        return split(total, max(min_calls, min(total, max_parallel)))
+    return min(candidates, key=lambda counts: (round(estimate(counts, model, max_parallel), 1), len(counts)))
+
+
+def describe(counts: List[int]) -> str:
+    return f"{len(counts)} call(s) of {'/'.join(str(n) for n in counts)} image(s)"
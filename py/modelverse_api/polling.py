@@ -0,0 +1,158 @@
+"""
+Polling of asynchronous Modelverse tasks.
+
+All video nodes wait for their task here. The wait is sliced so that pressing
+Cancel in ComfyUI is noticed within a fraction of a second; the remote task is
+then cancelled (best effort) and the abort recorded in the task journal.
+Progress is reported to the UI on every poll (see progress.py). With callbacks
+configured (see callbacks.py), pollers wait for the notification instead.
+"""
+import threading
+import time
+
+from .callbacks import callback_receiver
+from .progress import TaskProgress
+from .task_journal import CANCELLED, FAILED, SUCCEEDED, TIMED_OUT, task_journal
+
+
+POLL_INTERVAL = 5
+INTERRUPT_CHECK_INTERVAL = 0.25
+
+
+def _model_management():
+    try:
+        import comfy.model_management
+    except ImportError:
+        return None
+    return comfy.model_management
+
+
+def is_interrupted() -> bool:
+    """True if the user pressed Cancel in ComfyUI."""
+    model_management = _model_management()
+    return model_management is not None and model_management.processing_interrupted()
+
+
+def check_interrupted():
+    """
+    Raise ComfyUI's interrupt exception if the user pressed Cancel.
+
+    Safe on worker threads: the flag is left set, so every concurrent request
+    and ComfyUI itself still see the Cancel. ComfyUI clears it when the next
+    prompt starts.
+    """
+    model_management = _model_management()
+    if model_management is not None and model_management.processing_interrupted():
+        raise model_management.InterruptProcessingException()
+
+
+def throw_if_interrupted():
+    """check_interrupted that also clears the flag; only for the thread executing the node."""
+    model_management = _model_management()
+    if model_management is not None:
+        model_management.throw_exception_if_processing_interrupted()
+
+
+def is_interrupt(error: BaseException) -> bool:
+    """True if error is ComfyUI's interrupt exception."""
+    model_management = _model_management()
+    return model_management is not None and isinstance(error, model_management.InterruptProcessingException)
+
+
+def interruptible_sleep(seconds: float, mv_client=None, task_id=None, wake_event=None):
+    """
+    time.sleep that returns early on Cancel, cancelling task_id first if given,
+    or as soon as wake_event is set.
+    """
+    deadline = time.monotonic() + seconds
+    while True:
+        abort_if_interrupted(mv_client, task_id)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        if wake_event is None:
+            time.sleep(min(INTERRUPT_CHECK_INTERVAL, remaining))
+        elif wake_event.wait(min(INTERRUPT_CHECK_INTERVAL, remaining)):
+            return
+
+
+def abort_if_interrupted(mv_client=None, task_id=None):
+    if not is_interrupted():
+        return
+    if mv_client is not None and task_id:
+        print("INFO:", f"Cancelling task {task_id}")
+        mv_client.cancel_task(task_id)
+        task_journal.record(task_id, CANCELLED)
+    check_interrupted()
+
+
+def poll_task(mv_client, task_id, max_retries=180, interval=POLL_INTERVAL, retry_errors=False):
+    """
+    Wait for task_id and return its first output URL.
+
+    Status comes from the client's shared StatusBatcher, or from a callback
+    notification when callbacks are configured.
+
+    Args:
+        max_retries: waits of interval seconds before giving up
+        retry_errors: keep polling when a status query fails instead of raising
+    """
+    progress = TaskProgress(task_id)
+    wake_event = threading.Event()
+    if callback_receiver.enabled:
+        callback_receiver.register(task_id, wake_event)
+    mv_client.status_batcher.watch(task_id, wake_event)
+    try:
+        return _poll_task(mv_client, task_id, max_retries, interval, retry_errors, progress, wake_event)
+    finally:
+        mv_client.status_batcher.unwatch(task_id)
+        if callback_receiver.enabled:
+            callback_receiver.unregister(task_id)
+
+
+def _next_status(mv_client, task_id):
+    """Newest status delivered by a callback or the status batcher, None if nothing new."""
+    status_res = callback_receiver.take(task_id) if callback_receiver.enabled else None
+    polled = mv_client.status_batcher.take(task_id)
+    if isinstance(polled, Exception) and status_res is None:
+        raise polled
+    return status_res or (polled if not isinstance(polled, Exception) else None)
+
+
+def _poll_task(mv_client, task_id, max_retries, interval, retry_errors, progress, wake_event):
+    for i in range(max_retries):
+        abort_if_interrupted(mv_client, task_id)
+        wake_event.clear()
+        try:
+            status_res = _next_status(mv_client, task_id)
+        except Exception as e:
+            if not retry_errors:
+                raise
+            print(f"Error checking task status: {e}, retrying...")
+            status_res = None
+        if status_res is None:
+            interruptible_sleep(interval, mv_client, task_id, wake_event)
+            continue
+        task_status = status_res.get("output", {}).get("task_status")
+        progress.update(task_status, status_res.get("output", {}))
+
+        if task_status == "Success":
+            urls = status_res.get("output", {}).get("urls", [])
+            if urls:
+                task_journal.record(task_id, SUCCEEDED, **progress.timings())
+                return urls[0]
+            task_journal.record(task_id, FAILED, error="no output URL", **progress.timings())
+            raise Exception("Task succeeded but no video URL returned")
+        if task_status == "Failure":
+            error = status_res.get("output", {}).get("error_message", "Unknown error")
+            task_journal.record(task_id, FAILED, error=error, **progress.timings())
+            raise Exception(f"Task failed: {error}")
+        if task_status in ["Pending", "Running"]:
+            print(f"Task {task_id}: {task_status} ({i + 1}/{max_retries})")
+            interruptible_sleep(interval, mv_client, task_id, wake_event)
+            continue
+        raise Exception(f"Unknown status: {task_status}")
+
+    progress.finish("Timeout")
+    task_journal.record(task_id, TIMED_OUT, **progress.timings())
+    raise Exception("Task timed out")
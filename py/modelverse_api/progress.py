@@ -0,0 +1,173 @@
+"""
+Live progress of remote tasks.
+
+While a task is polled, the node's ComfyUI progress bar is advanced and a
+"modelverse.task_progress" event is sent to the browser with the time spent
+queued and running, the progress and an ETA. The ETA comes from the median
+run time of recent tasks of the same model (see TaskJournal); a "progress"
+field in the status response takes precedence over it. The
+modelverse_progress.js web extension draws these on the node.
+
+Nodes that send several image requests show each request's first image on
+the node as a preview as soon as that request completes (ResultPreviewer).
+"""
+import asyncio
+import io
+import time
+from typing import Optional
+
+from PIL import Image
+
+from .task_journal import task_journal
+from .utils import PREFETCHED_KEY, prefetch_items
+
+
+EVENT = "modelverse.task_progress"
+# Estimated progress never reaches 100% before the task reports success
+MAX_ESTIMATED_PROGRESS = 0.95
+PREVIEW_MAX_SIZE = 512
+
+
+def _server():
+    try:
+        import server
+    except ImportError:
+        return None
+    return getattr(server.PromptServer, "instance", None)
+
+
+def _executing_node_id(prompt_server) -> Optional[str]:
+    try:
+        from comfy_execution.utils import get_executing_context
+        context = get_executing_context()
+        if context is not None:
+            return context.node_id
+    except ImportError:
+        pass
+    return getattr(prompt_server, "last_node_id", None) if prompt_server is not None else None
+
+
+def _progress_bar(node_id, total=100):
+    try:
+        from comfy.utils import ProgressBar
+    except ImportError:
+        return None
+    try:
+        return ProgressBar(total, node_id=node_id)
+    except TypeError:  # older ComfyUI without node_id
+        return ProgressBar(total)
+
+
+def _reported_progress(output: dict) -> Optional[float]:
+    value = output.get("progress")
+    try:
+        value = float(str(value).rstrip("%"))
+    except (TypeError, ValueError):
+        return None
+    # Accept both 0..1 and 0..100
+    return min(value / 100.0 if value > 1 else value, 1.0)
+
+
+class TaskProgress:
+
+    def __init__(self, task_id: str, model: Optional[str] = None):
+        submitted = task_journal.submitted(task_id) or {}
+        self.task_id = task_id
+        self.model = model or submitted.get("model")
+        self.submitted_at = submitted.get("time", time.time())
+        self.started_at = None
+        self.expected = task_journal.expected_duration(self.model)
+        self.server = _server()
+        self.node_id = _executing_node_id(self.server)
+        self.bar = _progress_bar(self.node_id)
+
+    def queued_seconds(self) -> float:
+        return (self.started_at or time.time()) - self.submitted_at
+
+    def running_seconds(self) -> float:
+        return time.time() - self.started_at if self.started_at else 0.0
+
+    def update(self, status: str, output: Optional[dict] = None):
+        if status == "Running" and self.started_at is None:
+            self.started_at = time.time()
+
+        progress = _reported_progress(output or {})
+        eta = None
+        if self.expected and status == "Running":
+            eta = max(self.expected - self.running_seconds(), 0.0)
+            if progress is None:
+                progress = min(self.running_seconds() / self.expected, MAX_ESTIMATED_PROGRESS)
+        elif self.expected and status == "Pending":
+            eta = self.expected
+        if status == "Success":
+            progress, eta = 1.0, 0.0
+        self._send(status, progress, eta)
+
+    def finish(self, status: str):
+        self.update(status)
+
+    def timings(self) -> dict:
+        """Queued and running time, recorded in the journal when the task ends."""
+        timings = {"queued": round(self.queued_seconds(), 1)}
+        if self.started_at is not None:
+            timings["running"] = round(self.running_seconds(), 1)
+        return timings
+
+    def _send(self, status: str, progress: Optional[float], eta: Optional[float]):
+        if self.bar is not None and progress is not None:
+            self.bar.update_absolute(int(progress * 100), 100)
+        if self.server is None:
+            return
+        data = {
+            "node": self.node_id,
+            "task_id": self.task_id,
+            "model": self.model,
+            "status": status,
+            "queued_seconds": round(self.queued_seconds(), 1),
+            "running_seconds": round(self.running_seconds(), 1),
+            "progress": progress,
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+        }
+        try:
+            self.server.send_sync(EVENT, data, getattr(self.server, "client_id", None))
+        except Exception as e:
+            print("WARN:", f"Cannot send task progress: {e}")
+
+
+def _preview_image(data_list) -> Optional[Image.Image]:
+    items = prefetch_items(data_list)
+    for item in items:
+        data_bytes = item.get(PREFETCHED_KEY)
+        if not data_bytes:
+            continue
+        try:
+            with Image.open(io.BytesIO(data_bytes)) as img:
+                img.draft("RGB", (PREVIEW_MAX_SIZE, PREVIEW_MAX_SIZE))
+                preview = img.convert("RGB")
+        except Exception:
+            continue
+        preview.thumbnail((PREVIEW_MAX_SIZE, PREVIEW_MAX_SIZE))
+        return preview
+    return None
+
+
+class ResultPreviewer:
+    """
+    on_result callback for ModelverseClient.run_tasks: advances the node's
+    progress bar per completed request and shows its first image as the
+    preview. The images are loaded once here and reused for the final batch.
+    """
+
+    def __init__(self, total: int, enabled: bool = True):
+        self.total = total
+        self.enabled = enabled
+        self.done = 0
+        self.bar = _progress_bar(_executing_node_id(_server()), total) if enabled else None
+
+    async def __call__(self, index: int, data_list):
+        if not self.enabled:
+            return
+        preview = await asyncio.to_thread(_preview_image, data_list)
+        self.done += 1
+        if self.bar is not None:
+            self.bar.update_absolute(self.done, self.total, ("JPEG", preview, PREVIEW_MAX_SIZE) if preview else None)
@@ -7,7 +7,7 @@ from typing import Any, Dict, List, Optional
 from pydantic import Field
 from torch import Tensor
 
-from ..utils import BaseRequest, image_to_base64
+from ..utils import BaseRequest, image_to_url
 
 
 MODEL = "doubao-seedance-2-0-260128"
@@ -23,7 +23,7 @@ def _resolve_image(image: Optional[Tensor], url: str, label: str) -> Optional[st
     if has_url:
         return url.strip()
     if has_image:
-        encoded = image_to_base64(image)
+        encoded = image_to_url(image, MODEL)
         if not encoded:
             raise ValueError(f"{label}: failed to convert image to base64")
         return encoded
@@ -51,7 +51,7 @@ class FluxDev(BaseRequest):
         self.height = height
         self.strength = strength
         self.image = image_to_base64(
-            image) if isinstance(image, Tensor) else None
+            image, "black-forest-labs/flux.1-dev") if isinstance(image, Tensor) else None
 
     def build_payload(self) -> dict:
         """Builds the request payload dictionary."""
@@ -1,6 +1,6 @@
 from typing import Optional
 from pydantic import Field
-from ..utils import BaseRequest, image_to_base64
+from ..utils import BaseRequest, encode_images, image_to_base64
 from torch import Tensor
 
 
@@ -31,7 +31,7 @@ class FluxKontextMax(BaseRequest):
         self.guidance_scale = guidance_scale
         self.seed = seed
         self.image = image_to_base64(
-            image) if isinstance(image, Tensor) else None
+            image, "black-forest-labs/flux-kontext-max") if isinstance(image, Tensor) else image
 
     def build_payload(self) -> dict:
         """Builds the request payload dictionary."""
@@ -83,8 +83,7 @@ class FluxKontextMaxMulti(BaseRequest):
         self.prompt = prompt
         self.guidance_scale = guidance_scale
         self.seed = seed
-        self.images = [image_to_base64(
-            image) for image in images if isinstance(image, Tensor)]
+        self.images = encode_images(images, "black-forest-labs/flux-kontext-max/multi")
 
     def build_payload(self) -> dict:
         """Builds the request payload dictionary."""
@@ -1,6 +1,6 @@
 from typing import Optional
 from pydantic import Field
-from ..utils import BaseRequest, image_to_base64
+from ..utils import BaseRequest, encode_images, image_to_base64
 from torch import Tensor
 
 
@@ -32,7 +32,7 @@ class FluxKontextPro(BaseRequest):
         self.seed = seed
 
         self.image = image_to_base64(
-            image) if isinstance(image, Tensor) else None
+            image, "black-forest-labs/flux-kontext-pro") if isinstance(image, Tensor) else image
 
     def build_payload(self) -> dict:
         """Builds the request payload dictionary."""
@@ -84,8 +84,7 @@ class FluxKontextProMulti(BaseRequest):
         self.prompt = prompt
         self.guidance_scale = guidance_scale
         self.seed = seed
-        self.images = [image_to_base64(
-            image) for image in images if isinstance(image, Tensor)]
+        self.images = encode_images(images, "black-forest-labs/flux-kontext-pro/multi")
 
     def build_payload(self) -> dict:
         """Builds the request payload dictionary."""
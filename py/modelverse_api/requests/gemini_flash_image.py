@@ -1,14 +1,15 @@
 from typing import Optional, List, Dict, Any
 from pydantic import Field
+from ..encoding import encode_with_policy
+from ..input_limits import fit_to_model
 from ..utils import BaseRequest
 from torch import Tensor
 import base64
-import io
 from PIL import Image
 import numpy as np
 
 
-def _tensor_to_base64(image: Tensor, mime_type: str = "image/png") -> Dict[str, str]:
+def _tensor_to_base64(image: Tensor, mime_type: str = "auto", model: Optional[str] = None) -> Dict[str, str]:
     """Convert a ComfyUI image tensor (HWC or 4D with batch) to base64 without data URI."""
     if image is None:
         return None
@@ -19,15 +20,14 @@ def _tensor_to_base64(image: Tensor, mime_type: str = "image/png") -> Dict[str,
 
     # Tensor (H, W, C) in 0..1 -> uint8
     np_img = np.clip(255.0 * image.cpu().numpy(), 0, 255).astype(np.uint8)
-    pil_img = Image.fromarray(np_img)
+    pil_img = fit_to_model(Image.fromarray(np_img), model)
 
-    fmt = 'PNG' if mime_type.lower().endswith('png') else 'JPEG'
-    with io.BytesIO() as bio:
-        pil_img.save(bio, format=fmt)
-        data = bio.getvalue()
+    # "auto" lets the encoder policy pick; an explicit type is honoured for photos
+    preferred = None if mime_type == "auto" else mime_type.split("/")[-1].upper()
+    data, fmt = encode_with_policy(pil_img, model, preferred_format=preferred)
 
     return {
-        "mimeType": mime_type,
+        "mimeType": f"image/{fmt.lower()}",
         "data": base64.b64encode(data).decode("utf-8"),
     }
 
@@ -43,9 +43,9 @@ class GeminiFlashImageRequest(BaseRequest):
     prompt: str = Field(..., description="Text prompt")
     model: str = Field(default="gemini-3.1-flash-image", description="Gemini Flash Image model")
     image: Optional[Tensor] = Field(default=None, description="Optional input image for edit")
-    mime_type: str = Field(default="image/png", description="MIME type for inline image data")
+    mime_type: str = Field(default="auto", description="MIME type for inline image data, or auto to pick per image")
 
-    def __init__(self, prompt: str, model: str = "gemini-3.1-flash-image", image: Optional[Tensor] = None, mime_type: str = "image/png", **kwargs):
+    def __init__(self, prompt: str, model: str = "gemini-3.1-flash-image", image: Optional[Tensor] = None, mime_type: str = "auto", **kwargs):
         super().__init__(**kwargs)
         self.prompt = prompt
         self.model = model
@@ -60,7 +60,7 @@ class GeminiFlashImageRequest(BaseRequest):
 
         if isinstance(self.image, Tensor):
             parts.append({
-                "inlineData": _tensor_to_base64(self.image, self.mime_type)
+                "inlineData": _tensor_to_base64(self.image, self.mime_type, self.model)
             })
 
         payload = {
@@ -3,7 +3,6 @@ Gemini 3 Pro Image (Nano Banana Pro) request builder.
 Supports text-to-image and image editing with advanced features like
 aspect ratio, resolution control, and Google Search grounding.
 """
-import io
 import base64
 import numpy as np
 from PIL import Image
@@ -11,10 +10,13 @@ from typing import Optional, List, Dict, Any
 from pydantic import Field
 from torch import Tensor
 
+from ..encoding import encode_with_policy
+from ..executor import parallel_map
+from ..input_limits import fit_to_model
 from ..utils import BaseRequest
 
 
-def _tensor_to_base64(image: Tensor, mime_type: str = "image/png") -> Dict[str, str]:
+def _tensor_to_base64(image: Tensor, mime_type: str = "auto", model: Optional[str] = None) -> Dict[str, str]:
     """Convert a ComfyUI image tensor (HWC or 4D with batch) to base64 without data URI."""
     if image is None:
         return None
@@ -25,15 +27,14 @@ def _tensor_to_base64(image: Tensor, mime_type: str = "image/png") -> Dict[str,
 
     # Tensor (H, W, C) in 0..1 -> uint8
     np_img = np.clip(255.0 * image.cpu().numpy(), 0, 255).astype(np.uint8)
-    pil_img = Image.fromarray(np_img)
+    pil_img = fit_to_model(Image.fromarray(np_img), model)
 
-    fmt = 'PNG' if mime_type.lower().endswith('png') else 'JPEG'
-    with io.BytesIO() as bio:
-        pil_img.save(bio, format=fmt)
-        data = bio.getvalue()
+    # "auto" lets the encoder policy pick; an explicit type is honoured for photos
+    preferred = None if mime_type == "auto" else mime_type.split("/")[-1].upper()
+    data, fmt = encode_with_policy(pil_img, model, preferred_format=preferred)
 
     return {
-        "mimeType": mime_type,
+        "mimeType": f"image/{fmt.lower()}",
         "data": base64.b64encode(data).decode("utf-8"),
     }
 
@@ -49,7 +50,7 @@ class GeminiProImageRequest(BaseRequest):
 
     prompt: str = Field(..., description="Text prompt")
     images: Optional[List[Tensor]] = Field(default=None, description="Optional input images (up to 14)")
-    mime_type: str = Field(default="image/png", description="MIME type for inline image data")
+    mime_type: str = Field(default="auto", description="MIME type for inline image data, or auto to pick per image")
     aspect_ratio: Optional[str] = Field(default=None, description="Aspect ratio: 1:1, 2:3, 3:2, 3:4, 4:3, 4:5, 5:4, 9:16, 16:9, 21:9")
     image_size: Optional[str] = Field(default=None, description="Image resolution: 1K, 2K, 4K")
     use_google_search: bool = Field(default=False, description="Enable Google Search grounding")
@@ -58,7 +59,7 @@ class GeminiProImageRequest(BaseRequest):
         self,
         prompt: str,
         images: Optional[List[Tensor]] = None,
-        mime_type: str = "image/png",
+        mime_type: str = "auto",
         aspect_ratio: Optional[str] = None,
         image_size: Optional[str] = None,
         use_google_search: bool = False,
@@ -81,11 +82,10 @@ class GeminiProImageRequest(BaseRequest):
 
         # Add images (up to 14)
         if self.images:
-            for img in self.images[:14]:  # Limit to 14 images
-                if isinstance(img, Tensor):
-                    parts.append({
-                        "inlineData": _tensor_to_base64(img, self.mime_type)
-                    })
+            images = [img for img in self.images[:14] if isinstance(img, Tensor)]  # Limit to 14 images
+            inline_data = parallel_map(
+                lambda img: _tensor_to_base64(img, self.mime_type, "gemini-3-pro-image"), images)
+            parts.extend({"inlineData": data} for data in inline_data)
 
         payload = {
             "contents": [
@@ -1,13 +1,20 @@
 from typing import Optional, Tuple, Dict, Any
 from pydantic import Field
+from ..encoding import encode_with_policy
+from ..input_limits import fit_to_model
 from ..utils import BaseRequest, tensor2images
 from torch import Tensor
 import io
 from PIL import Image
 
 
-def _tensor_to_png_file(image: Tensor, filename: str) -> Tuple[str, bytes, str] | None:
-    """Convert a ComfyUI tensor image (3D or 4D) to a PNG file tuple for requests files."""
+def _tensor_to_file(image: Tensor, filename: str, model: Optional[str] = None, lossless: bool = False) -> Tuple[str, bytes, str] | None:
+    """
+    Convert a ComfyUI tensor image (3D or 4D) to a file tuple for requests files.
+
+    The format follows the model's encoder policy unless lossless is set, in
+    which case PNG is used (masks, and images edited together with a mask).
+    """
     if image is None:
         return None
     # Keep batch if present; tensor2images expects a batch dimension
@@ -24,10 +31,15 @@ def _tensor_to_png_file(image: Tensor, filename: str) -> Tuple[str, bytes, str]
         import numpy as _np
         arr = (image.cpu().numpy() * 255.0).clip(0, 255).astype('uint8')
         pil_img = _Image.fromarray(arr)
+    pil_img = fit_to_model(pil_img, model)
+    if not lossless:
+        data, fmt = encode_with_policy(pil_img, model)
+        ext = fmt.lower()
+        return (f"{filename}.{ext}", data, f"image/{ext}")
     with io.BytesIO() as bio:
         pil_img.save(bio, format="PNG")
         data = bio.getvalue()
-    return (filename, data, "image/png")
+    return (f"{filename}.png", data, "image/png")
 
 
 class GPTImage1Edit(BaseRequest):
@@ -84,11 +96,11 @@ class GPTImage1Edit(BaseRequest):
         data = {k: v for k, v in data.items() if v is not None and v != ""}
 
         files = {}
-        img_file = _tensor_to_png_file(self.image, "image.png")
+        img_file = _tensor_to_file(self.image, "image", "gpt-image-1", lossless=self.mask is not None)
         if img_file is not None:
             files["image"] = img_file
         if self.mask is not None:
-            mask_file = _tensor_to_png_file(self.mask, "mask.png")
+            mask_file = _tensor_to_file(self.mask, "mask", "gpt-image-1", lossless=True)
             if mask_file is not None:
                 files["mask"] = mask_file
 
@@ -4,7 +4,7 @@ from typing import Optional
 
 from torch import Tensor
 
-from ..utils import encode_image, tensor2images
+from ..utils import encode_image, prepare_image, stage_image
 
 
 MODEL_KLING_V3 = "kling-v3"
@@ -27,7 +27,7 @@ def normalize_kling_image_value(value: str) -> str:
     return value
 
 
-def resolve_image(image: Optional[Tensor], url: str, label: str) -> Optional[str]:
+def resolve_image(image: Optional[Tensor], url: str, label: str, model: Optional[str] = None) -> Optional[str]:
     has_url = url and url.strip()
     has_image = image is not None
     if has_url and has_image:
@@ -35,7 +35,10 @@ def resolve_image(image: Optional[Tensor], url: str, label: str) -> Optional[str
     if has_url:
         return normalize_kling_image_value(url)
     if has_image:
-        data_bytes, _ = encode_image(tensor2images(image)[0])
+        staged_url = stage_image(image, model)
+        if staged_url:
+            return staged_url
+        data_bytes, _ = encode_image(prepare_image(image, model), model=model)
         if not data_bytes:
             raise ValueError(f"{label}: failed to convert image to base64")
         return base64.b64encode(data_bytes).decode("utf-8")
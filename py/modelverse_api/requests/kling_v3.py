@@ -7,6 +7,7 @@ from typing import Any, Dict, Optional
 from pydantic import Field
 from torch import Tensor
 
+from ..executor import parallel_map
 from ..utils import BaseRequest
 from .kling_common import (
     ASPECT_RATIOS,
@@ -104,8 +105,10 @@ class KlingV3(BaseRequest):
         if self.negative_prompt:
             task_input["negative_prompt"] = self.negative_prompt
 
-        first_url = resolve_image(self.first_frame, self.first_frame_url, "First frame")
-        last_url = resolve_image(self.last_frame, self.last_frame_url, "Last frame")
+        first_url, last_url = parallel_map(lambda args: resolve_image(*args, MODEL_KLING_V3), [
+            (self.first_frame, self.first_frame_url, "First frame"),
+            (self.last_frame, self.last_frame_url, "Last frame"),
+        ])
 
         if self._is_motion_control():
             if not first_url:
@@ -7,6 +7,7 @@ from typing import Any, Dict, List, Optional
 from pydantic import Field
 from torch import Tensor
 
+from ..executor import parallel_map
 from ..utils import BaseRequest
 from .kling_common import (
     ASPECT_RATIOS,
@@ -92,8 +93,10 @@ class KlingV3Omni(BaseRequest):
 
     def build_image_list(self) -> List[Dict[str, str]]:
         image_list: List[Dict[str, str]] = []
-        first_url = resolve_image(self.first_frame, self.first_frame_url, "First frame")
-        last_url = resolve_image(self.last_frame, self.last_frame_url, "Last frame")
+        first_url, last_url = parallel_map(lambda args: resolve_image(*args, MODEL_KLING_V3_OMNI), [
+            (self.first_frame, self.first_frame_url, "First frame"),
+            (self.last_frame, self.last_frame_url, "Last frame"),
+        ])
         if first_url:
             image_list.append({"image_url": first_url, "type": "first_frame"})
         if last_url:
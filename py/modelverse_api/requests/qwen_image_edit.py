@@ -45,7 +45,7 @@ class QwenImageEdit(BaseRequest):
         self.steps = steps
         self.guidance_scale = guidance_scale
         self.response_format = response_format
-        self.image = image_to_base64(image)
+        self.image = image_to_base64(image, "Qwen/Qwen-Image-Edit")
 
     def build_payload(self) -> dict:
         payload = {
@@ -46,7 +46,7 @@ class Step1xEdit(BaseRequest):
         self.seed = seed
         self.guidance_scale = guidance_scale
         self.num_inference_steps = num_inference_steps
-        self.image = image_to_base64(image)
+        self.image = image_to_base64(image, "stepfun-ai/step1x-edit")
 
     def build_payload(self) -> dict:
         """Builds the request payload dictionary."""
@@ -0,0 +1,86 @@
+"""
+In-memory cache of secrets.json.
+
+The file is parsed once and re-read only when its mtime or size changes, so
+IS_CHANGED and create_client on many Secret Client nodes stay cheap. Writes go
+to a temp file that is renamed over secrets.json under a process lock, so
+concurrent route calls cannot interleave or leave a truncated file behind.
+"""
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, Optional
+
+
+class SecretsStore:
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._secrets: Dict[str, str] = {}
+        self._signature = None
+
+    def _stat_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _refresh(self):
+        signature = self._stat_signature()
+        if signature is None:
+            self._write({})
+            return
+        if signature != self._signature:
+            with open(self.path) as secrets_file:
+                self._secrets = json.load(secrets_file)
+            self._signature = signature
+
+    def _write(self, secrets: Dict[str, str]):
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp_path = tempfile.mkstemp(prefix=".secrets-", suffix=".json", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as tmp_file:
+                json.dump(secrets, tmp_file, indent=2)
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._secrets = dict(secrets)
+        self._signature = self._stat_signature()
+
+    def all(self) -> Dict[str, str]:
+        """Return a copy of all secrets."""
+        with self._lock:
+            self._refresh()
+            return dict(self._secrets)
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        with self._lock:
+            self._refresh()
+            return self._secrets.get(key, default)
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._refresh()
+            self._write({**self._secrets, key: value})
+
+    def delete(self, key: str) -> bool:
+        """Remove a secret. Returns False if it did not exist."""
+        with self._lock:
+            self._refresh()
+            if key not in self._secrets:
+                return False
+            secrets = dict(self._secrets)
+            del secrets[key]
+            self._write(secrets)
+            return True
+
+    def replace(self, secrets: Dict[str, str]):
+        with self._lock:
+            self._write(secrets)
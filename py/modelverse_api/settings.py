@@ -0,0 +1,46 @@
+"""
+Optional tuning settings read from config.ini.
+
+Every setting has a default, so a config.ini that only has the [API] section
+keeps working. Sections and keys are documented in the README.
+"""
+import configparser
+import os
+
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CONFIG_PATH = os.path.join(PLUGIN_DIR, "config.ini")
+
+_config = configparser.ConfigParser()
+try:
+    _config.read(CONFIG_PATH)
+except Exception as e:
+    print(f"Error reading config file for settings: {e}")
+
+
+def get_setting(section, key, fallback=""):
+    value = _config.get(section, key, fallback=None)
+    if value is None or value.strip() == "":
+        return fallback
+    return value.strip()
+
+
+def get_int(section, key, fallback=0):
+    try:
+        return int(get_setting(section, key, fallback))
+    except ValueError:
+        return fallback
+
+
+def get_float(section, key, fallback=0.0):
+    try:
+        return float(get_setting(section, key, fallback))
+    except ValueError:
+        return fallback
+
+
+def get_bool(section, key, fallback=False):
+    value = get_setting(section, key, None)
+    if value is None:
+        return fallback
+    return value.lower() in ("1", "true", "yes", "on")
@@ -0,0 +1,74 @@
+"""
+Coalescing of identical in-flight requests.
+
+When two prompts (or two branches of one graph) send the same generation
+request at the same time, only the first one goes to the API; the others wait
+for it and get a copy of its result. Only requests with an explicit seed are
+coalesced: without one, identical payloads are expected to give different
+images, as num_requests relies on. Seeds -1 and 0 mean "random" for some
+models, so they are not treated as explicit.
+"""
+import copy
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from .metrics import metrics
+
+
+COALESCED_ENDPOINTS = ("/v1/images/generations", "/v1/tasks/submit")
+RANDOM_SEEDS = (-1, 0)
+
+
+def _seed_of(payload: dict):
+    for container in (payload, payload.get("parameters"), payload.get("input")):
+        if isinstance(container, dict) and "seed" in container:
+            return container["seed"]
+    return None
+
+
+def request_fingerprint(endpoint: str, payload) -> Optional[str]:
+    """Key identifying a coalescable request, or None if it must always be sent."""
+    if endpoint not in COALESCED_ENDPOINTS or not isinstance(payload, dict):
+        return None
+    seed = _seed_of(payload)
+    if not isinstance(seed, int) or seed in RANDOM_SEEDS:
+        return None
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{endpoint}\n{body}".encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # fingerprint -> Future of the request in flight
+
+    def run(self, key: Optional[str], fn: Callable):
+        """fn(), unless a call with the same key is in flight; then wait for its result."""
+        if key is None:
+            return fn()
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            metrics.incr("coalesced_requests")
+            print("INFO:", "Identical request already in flight, waiting for its result.")
+            return copy.deepcopy(future.result())
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
@@ -0,0 +1,124 @@
+"""
+Shared status polling for all tasks waited on through one client.
+
+Instead of every waiting node querying its own task every 5 s, each client
+runs one background poller that, on a shared cadence, fetches the status of
+every task being waited on:
+    - with one bulk request, if BULK_STATUS_ENDPOINT is set in the [TASKS]
+      section of config.ini (GET with task_ids=id1,id2,...);
+    - otherwise with one GET per task, at most STATUS_CONCURRENCY at a time,
+      over the client's pooled keep-alive connections.
+Waiters are woken through their own threading.Event when a new status lands.
+The status_queries and status_results counters in /modelverse-metrics show
+how many HTTP calls served how many task statuses.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from .metrics import metrics
+from .settings import get_int, get_setting
+
+
+BULK_STATUS_ENDPOINT = get_setting("TASKS", "BULK_STATUS_ENDPOINT")
+STATUS_CONCURRENCY = get_int("TASKS", "STATUS_CONCURRENCY", 8)
+BULK_MAX_TASKS = 50
+
+
+class StatusBatcher:
+
+    def __init__(self, client, interval: float = 5, concurrency: int = STATUS_CONCURRENCY,
+                 bulk_endpoint: str = BULK_STATUS_ENDPOINT):
+        self.client = client
+        self.interval = interval
+        self.concurrency = max(1, concurrency)
+        self.bulk_endpoint = bulk_endpoint
+        self._lock = threading.Lock()
+        self._watched: Dict[str, threading.Event] = {}
+        self._results = {}  # task_id -> status response or the exception raised fetching it
+        self._thread = None
+        self._executor = None
+
+    def watch(self, task_id: str, event: threading.Event):
+        """Start fetching task_id on the shared cadence; event is set on every new status."""
+        with self._lock:
+            self._watched[task_id] = event
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="modelverse-status", daemon=True)
+                self._thread.start()
+
+    def unwatch(self, task_id: str):
+        with self._lock:
+            self._watched.pop(task_id, None)
+            self._results.pop(task_id, None)
+
+    def take(self, task_id: str):
+        """Latest status fetched for task_id since the last call (or an exception), else None."""
+        with self._lock:
+            return self._results.pop(task_id, None)
+
+    def _run(self):
+        while True:
+            started = time.monotonic()
+            with self._lock:
+                task_ids = list(self._watched)
+                if not task_ids:
+                    self._thread = None
+                    return
+            try:
+                results = self._fetch(task_ids)
+            except Exception as e:
+                print("WARN:", f"Task status poll failed: {e}")
+                results = {}
+            for task_id, result in results.items():
+                with self._lock:
+                    event = self._watched.get(task_id)
+                    if event is None:
+                        continue
+                    self._results[task_id] = result
+                event.set()
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def _fetch(self, task_ids: List[str]) -> dict:
+        # Bulk queries are sent with one key, so they cannot serve key pools
+        if self.bulk_endpoint and self.client.key_pool is None:
+            results = {}
+            for start in range(0, len(task_ids), BULK_MAX_TASKS):
+                results.update(self._fetch_bulk(task_ids[start:start + BULK_MAX_TASKS]))
+            return results
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="modelverse-status")
+        results = dict(zip(task_ids, self._executor.map(self._fetch_one, task_ids)))
+        metrics.incr("status_results", len(results))
+        return results
+
+    def _fetch_one(self, task_id: str):
+        metrics.incr("status_queries")
+        try:
+            return self.client.get_task_status(task_id)
+        except Exception as e:
+            return e
+
+    def _fetch_bulk(self, task_ids: List[str]) -> dict:
+        metrics.incr("status_queries")
+        try:
+            response = self.client.get(self.bulk_endpoint, params={"task_ids": ",".join(task_ids)},
+                                       interruptible=False)
+        except Exception as e:
+            return {task_id: e for task_id in task_ids}
+        if isinstance(response, dict):
+            response = response.get("tasks") or response.get("data") or []
+        results = {}
+        for item in response if isinstance(response, list) else []:
+            output = _output_of(item)
+            if output and output.get("task_id") in task_ids:
+                results[output["task_id"]] = {"output": output}
+        metrics.incr("status_results", len(results))
+        return results
+
+
+def _output_of(item) -> Optional[dict]:
+    if not isinstance(item, dict):
+        return None
+    return item.get("output") if isinstance(item.get("output"), dict) else item
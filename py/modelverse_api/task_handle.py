@@ -0,0 +1,58 @@
+"""
+MODELVERSE_TASK handles: submitting a remote task and waiting for it in
+separate nodes.
+
+A "Submit" variant of a video node returns as soon as its task is accepted,
+with a handle recording the client, model, task_id and submit time. The
+generic "Await Task" node resolves handles through the shared poller. A graph
+can thus submit all of its remote jobs up front, so they render in parallel,
+and collect the results at the end.
+"""
+import time
+
+from .task_journal import task_journal
+
+
+TASK_TYPE = "MODELVERSE_TASK"
+
+
+def make_task_handle(client, task_id: str, model=None, **poll_args) -> dict:
+    submitted = task_journal.submitted(task_id) or {}
+    return {
+        "client": client,
+        "task_id": task_id,
+        "model": model or submitted.get("model"),
+        "submitted_at": submitted.get("time", time.time()),
+        # Arguments the node would have polled with, e.g. max_retries
+        "poll_args": poll_args,
+    }
+
+
+def submit_variant(node_cls, description: str):
+    """
+    Node class that runs node_cls up to its task submission and returns a
+    MODELVERSE_TASK handle. node_cls must poll through self._poll_task.
+    """
+
+    class SubmitNode(node_cls):
+        RETURN_TYPES = (TASK_TYPE,)
+        RETURN_NAMES = ("task",)
+        FUNCTION = "submit"
+        DESCRIPTION = description
+
+        def submit(self, **kwargs):
+            self._submitted = None
+            getattr(self, node_cls.FUNCTION)(**kwargs)
+            if self._submitted is None:
+                raise Exception(f"{node_cls.__name__} did not submit a task")
+            task_id, poll_args = self._submitted
+            print("INFO:", f"Task {task_id} submitted, resolve it with Await Task.")
+            return (make_task_handle(kwargs.get("client"), task_id, **poll_args),)
+
+        def _poll_task(self, mv_client, task_id, **poll_args):
+            self._submitted = (task_id, poll_args)
+            return None
+
+    SubmitNode.__name__ = f"{node_cls.__name__}Submit"
+    SubmitNode.__qualname__ = SubmitNode.__name__
+    return SubmitNode
@@ -0,0 +1,163 @@
+"""
+Append-only journal of remote tasks.
+
+Every submitted task and how it ended (succeeded, failed, cancelled, timed
+out) is appended as one JSON line to task_journal.jsonl in the plugin folder,
+so tasks still running or billing after a crash or a cancel can be traced.
+Set JOURNAL = false in the [TASKS] section of config.ini to disable it.
+
+The file is compacted once it holds twice MAX_FINISHED lines: the newest
+MAX_FINISHED finished tasks are kept, along with submitted tasks that have not
+ended yet. A submitted task nobody waits for (e.g. a Submit node whose Await
+node never ran) is closed as expired after SUBMITTED_TTL.
+"""
+import json
+import os
+import statistics
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Dict, List, Optional
+
+from .settings import PLUGIN_DIR, get_bool
+
+
+JOURNAL_PATH = os.path.join(PLUGIN_DIR, "task_journal.jsonl")
+# Recent successful run times kept per model for ETA estimates
+DURATION_SAMPLES = 50
+# Finished tasks kept when the journal is compacted
+MAX_FINISHED = 1000
+# Seconds after which a submitted task that never ended is closed as expired
+SUBMITTED_TTL = 24 * 3600
+
+SUBMITTED = "submitted"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TIMED_OUT = "timed_out"
+EXPIRED = "expired"
+
+
+class TaskJournal:
+
+    def __init__(self, path: str, enabled: bool = True):
+        self.path = path
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._submitted: Dict[str, dict] = {}  # task_id -> submit entry, while the task is open
+        self._durations = None  # model -> recent run times, loaded from the journal on first use
+        self._medians: Dict[str, float] = {}  # model -> median of _durations, until it changes
+        self._lines = None  # lines in the journal file, counted on first write
+
+    def record(self, task_id: str, event: str, **fields) -> dict:
+        entry = {"time": time.time(), "task_id": task_id, "event": event, **fields}
+        with self._lock:
+            entries = self._expire(entry["time"])
+            if event == SUBMITTED:
+                self._submitted[task_id] = entry
+            else:
+                submitted = self._submitted.pop(task_id, None)
+                if submitted is not None:
+                    entry.setdefault("model", submitted.get("model"))
+                    entry["elapsed"] = entry["time"] - submitted["time"]
+            if event == SUCCEEDED and self._durations is not None:
+                self._add_duration(entry)
+            self._write(entries + [entry])
+        return entry
+
+    def _expire(self, now: float) -> List[dict]:
+        """Close submitted tasks older than SUBMITTED_TTL; their entries to write."""
+        expired = [task_id for task_id, entry in self._submitted.items() if now - entry["time"] > SUBMITTED_TTL]
+        entries = []
+        for task_id in expired:
+            submitted = self._submitted.pop(task_id)
+            entries.append({"time": now, "task_id": task_id, "event": EXPIRED,
+                            "model": submitted.get("model"), "elapsed": now - submitted["time"]})
+        return entries
+
+    def _write(self, entries: List[dict]):
+        if not self.enabled:
+            return
+        try:
+            if self._lines is None:
+                self._lines = len(self._read_lines())
+            with open(self.path, "a", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._lines += len(entries)
+            if self._lines > 2 * MAX_FINISHED:
+                self._compact()
+        except OSError as e:
+            print("WARN:", f"Cannot write task journal: {e}")
+
+    def _compact(self):
+        """Rewrite the journal with the newest MAX_FINISHED finished tasks and the open ones."""
+        now = time.time()
+        entries = _parse(self._read_lines())
+        finished_ids = {e.get("task_id") for e in entries if e.get("event") != SUBMITTED}
+        finished = [e for e in entries if e.get("event") != SUBMITTED][-MAX_FINISHED:]
+        still_open = [e for e in entries if e.get("event") == SUBMITTED and e.get("task_id") not in finished_ids
+                      and now - e.get("time", 0) <= SUBMITTED_TTL]
+        kept = sorted(still_open + finished, key=lambda e: e.get("time", 0))
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in kept:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+        self._lines = len(kept)
+
+    def submitted(self, task_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._submitted.get(task_id)
+
+    def expected_duration(self, model: Optional[str]) -> Optional[float]:
+        """Median time recent tasks of model spent running, None without history."""
+        if not model:
+            return None
+        if self._durations is None:
+            entries = self.entries()
+            with self._lock:
+                if self._durations is None:
+                    self._durations = defaultdict(lambda: deque(maxlen=DURATION_SAMPLES))
+                    for entry in entries:
+                        if entry.get("event") == SUCCEEDED:
+                            self._add_duration(entry)
+        with self._lock:
+            if model not in self._medians:
+                samples = self._durations.get(model)
+                if not samples:
+                    return None
+                self._medians[model] = statistics.median(samples)
+            return self._medians[model]
+
+    def _add_duration(self, entry: dict):
+        # "running" excludes time spent queued; older entries only have "elapsed"
+        duration = entry.get("running", entry.get("elapsed"))
+        if entry.get("model") and duration:
+            self._durations[entry["model"]].append(duration)
+            self._medians.pop(entry["model"], None)
+
+    def entries(self) -> List[dict]:
+        """All journal entries, oldest first."""
+        with self._lock:
+            lines = self._read_lines()
+        return _parse(lines)
+
+    def _read_lines(self) -> List[str]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "r", encoding="utf-8") as f:
+            return f.readlines()
+
+
+def _parse(lines: List[str]) -> List[dict]:
+    entries = []
+    for line in lines:
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            continue
+    return entries
+
+
+task_journal = TaskJournal(JOURNAL_PATH, enabled=get_bool("TASKS", "JOURNAL", True))
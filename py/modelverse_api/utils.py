@@ -1,5 +1,6 @@
-import requests
+import asyncio
 import base64
+import hashlib
 import io
 import numpy
 import PIL
@@ -7,6 +8,11 @@ import requests
 import torch
 from collections.abc import Iterable
 from typing import List
+from .asset_staging import asset_stager, image_digest
+from .encoding import encode_with_policy
+from .executor import parallel_map
+from .http_cache import FETCH_TIMEOUT, image_cache
+from .input_limits import fit_to_model
 
 
 def imageurl2tensor(image_urls: List[dict]):
@@ -29,8 +35,166 @@ def imageurl2tensor(image_urls: List[dict]):
     return images2tensor(images)
 
 
+# Item key holding image bytes loaded ahead of the final decode
+PREFETCHED_KEY = "_prefetched_bytes"
+
+
+def _item_bytes(item):
+    """Encoded image bytes of one response item: its url if it loads, else its b64_json."""
+    if not isinstance(item, dict):
+        return None
+    if item.get(PREFETCHED_KEY) is not None:
+        return item[PREFETCHED_KEY]
+    if item.get("url"):
+        try:
+            return fetch_image(item["url"])
+        except Exception as e:
+            print("WARN:", f"Failed to load {item['url']}: {e}")
+    b64v = item.get("b64_json") or item.get("b64")
+    if not b64v:
+        return None
+    if isinstance(b64v, str) and b64v.startswith("data:"):
+        b64v = b64v.split(",", 1)[1]
+    return base64.b64decode(b64v)
+
+
+def prefetch_items(data_list):
+    """
+    Load the image bytes of the items of one request, in parallel, and keep
+    them on the items so that results2tensor does not load them again.
+    """
+    items = [item for item in data_list or [] if isinstance(item, dict)]
+    for item, data_bytes in zip(items, parallel_map(_item_bytes, items)):
+        item[PREFETCHED_KEY] = data_bytes
+    return items
+
+
+def _open_item(item):
+    """Open an item without decoding its pixels, so the output size is known up front."""
+    try:
+        data_bytes = _item_bytes(item)
+        return PIL.Image.open(io.BytesIO(data_bytes)) if data_bytes else None
+    except Exception as e:
+        print("WARN:", f"Cannot decode output image: {e}")
+        return None
+
+
+def results2tensor(results):
+    """
+    One IMAGE batch from the data lists returned by several requests.
+
+    Items may carry a url or b64_json. All items are fetched and decoded on the
+    shared worker pool, straight into a preallocated output tensor. Blocking;
+    async nodes should run it with asyncio.to_thread.
+    """
+    items = []
+    for data_list in results:
+        if not data_list:
+            print("WARN:", "No output in current request. Skipping...")
+            continue
+        items.extend(data_list)
+
+    opened = [img for img in parallel_map(_open_item, items) if img is not None]
+    print("INFO:", f"{len(opened)} of {len(items)} output images loaded successfully.")
+    if not opened:
+        return torch.zeros((1, 3, 1, 1))
+    width, height = opened[0].size
+    if any(img.size != (width, height) for img in opened):
+        raise ValueError(f"Output images have different sizes: {sorted(set(img.size for img in opened))}")
+
+    output = torch.empty((len(opened), height, width, 3), dtype=torch.float32)
+
+    def fill(index):
+        try:
+            with opened[index] as img:
+                output[index].copy_(torch.from_numpy(numpy.asarray(img.convert("RGB"))))
+        except Exception as e:
+            print("WARN:", f"Cannot decode output image: {e}")
+            return False
+        output[index].div_(255.0)
+        return True
+
+    decoded = parallel_map(fill, range(len(opened)))
+    if not all(decoded):
+        if not any(decoded):
+            return torch.zeros((1, 3, 1, 1))
+        output = output[torch.tensor(decoded)]
+    return output
+
+
+B64_SIGNATURES = {"iVBORw0KGgo": "png", "/9j/": "jpeg", "UklGR": "webp"}
+
+
+def result_urls(results):
+    """
+    URL of every item in the data lists of several requests, for the STRING
+    urls output. b64_json items are returned as data URIs.
+    """
+    urls = []
+    for data_list in results:
+        for item in data_list or []:
+            if not isinstance(item, dict):
+                continue
+            if item.get("url"):
+                urls.append(item["url"])
+                continue
+            b64v = item.get("b64_json") or item.get("b64")
+            if not b64v:
+                continue
+            if not b64v.startswith("data:"):
+                fmt = next((f for sig, f in B64_SIGNATURES.items() if b64v.startswith(sig)), "png")
+                b64v = f"data:image/{fmt};base64,{b64v}"
+            urls.append(b64v)
+    return urls
+
+
+def output_connected(prompt, unique_id, index=0):
+    """
+    Whether output index of node unique_id feeds another node, from the
+    hidden PROMPT input. True when that cannot be told.
+    """
+    if not isinstance(prompt, dict) or unique_id is None:
+        return True
+    for node in prompt.values():
+        for value in (node.get("inputs") or {}).values() if isinstance(node, dict) else ():
+            if isinstance(value, list) and len(value) == 2 and str(value[0]) == str(unique_id) and value[1] == index:
+                return True
+    return False
+
+
+async def image_results_outputs(results, download=True):
+    """
+    (IMAGE, urls, url_lines) outputs of an image node: urls is a list output,
+    url_lines the same URLs one per line for inputs such as image_urls. With
+    download off the results are not downloaded and decoded, so chaining the
+    URLs into a video node costs no local transfer. This is a widget rather
+    than a check of the IMAGE link, since ComfyUI caches outputs by inputs and
+    would keep serving the placeholder once IMAGE gets connected.
+    """
+    urls = result_urls(results)
+    if not download:
+        print("INFO:", f"Image download off, returning {len(urls)} URL(s) only.")
+        return (torch.zeros((1, 3, 1, 1)), urls, "\n".join(urls))
+    return (await asyncio.to_thread(results2tensor, results), urls, "\n".join(urls))
+
+
+def request_seed(seed, index):
+    """Seed of the index-th of several requests: seed + index, but -1 (random) stays random."""
+    return -1 if seed == -1 else seed + index
+
+
 def fetch_image(url, stream=True):
-    return requests.get(url, stream=stream).content
+    """Body of a one-off image URL such as a generated result, not cached."""
+    return requests.get(url, stream=stream, timeout=FETCH_TIMEOUT).content
+
+
+def load_image(data_bytes):
+    """
+    RGB image of encoded bytes fetched through image_cache, decoded once per
+    body. The image is shared between callers and must not be modified.
+    """
+    digest = hashlib.sha256(data_bytes).hexdigest()
+    return image_cache.memoized(digest, "pil", lambda: decode_image(data_bytes))
 
 
 def tensor2images(tensor):
@@ -46,7 +210,8 @@ def images2tensor(images):
 
 
 def decode_image(data_bytes, rtn_mask=False):
-    with io.BytesIO(data_bytes) as bytes_io:
+    """Decode image bytes, or a binary file object such as a streamed BytesIO."""
+    with (data_bytes if hasattr(data_bytes, "read") else io.BytesIO(data_bytes)) as bytes_io:
         img = PIL.Image.open(bytes_io)
         if not rtn_mask:
             img = img.convert('RGB')
@@ -57,34 +222,74 @@ def decode_image(data_bytes, rtn_mask=False):
     return img
 
 
-def encode_image(img, mask=None):
-    format = "JPEG"
-    if mask is not None:
-        format = "PNG"
-        img = img.copy()
-        img.putalpha(mask)
+def encode_image(img, mask=None, model=None):
+    """Encode with the model's encoder policy; images with a mask are always PNG."""
+    if mask is None:
+        return encode_with_policy(img, model)
+    format = "PNG"
+    img = img.copy()
+    img.putalpha(mask)
     with io.BytesIO() as bytes_io:
         img.save(bytes_io, format=format)
         data_bytes = bytes_io.getvalue()
     return data_bytes, format
 
 
+def inline_data_bytes(data):
+    """Image data of an inlineData.data value: a streamed buffer as is, a base64 string decoded."""
+    if hasattr(data, "read"):
+        return data
+    return base64.b64decode(data)
+
+
 def decorate_base64(base64, format="JPEG"):
     return f"data:image/{format};base64,{base64}"
 
 
-def image_to_base64(image):
+def prepare_image(image, model=None):
+    """First image of an IMAGE tensor as PIL, shrunk to the model's input cap."""
+    batch = image[:1] if image.ndim == 4 else image.unsqueeze(0)
+    return fit_to_model(tensor2images(batch)[0], model)
+
+
+def image_to_base64(image, model=None):
     if image is None:
         return None
-    data_bytes, format = encode_image(tensor2images(image)[0])
+    data_bytes, format = encode_image(prepare_image(image, model), model=model)
     return decorate_base64(base64.b64encode(data_bytes).decode("utf-8"), format=format)
 
 
+def encode_images(images, model=None):
+    """
+    Data URIs for a list of IMAGE tensors, encoded in parallel and in order.
+
+    Strings are taken as already encoded and passed through, so callers sending
+    the same images in several requests can encode them once up front.
+    """
+    images = [image for image in images if isinstance(image, (torch.Tensor, str))]
+    return parallel_map(lambda image: image if isinstance(image, str) else image_to_base64(image, model), images)
+
+
+def stage_image(image, model=None):
+    """Hosted URL for an IMAGE tensor if asset staging is configured, else None."""
+    if image is None or not asset_stager.enabled:
+        return None
+    img = prepare_image(image, model)
+    return asset_stager.stage(image_digest(img), lambda: encode_image(img, model=model))
+
+
+def image_to_url(image, model=None):
+    """Hosted URL for an IMAGE tensor, falling back to a base64 data URI."""
+    if image is None:
+        return None
+    return stage_image(image, model) or image_to_base64(image, model)
+
+
 def image_to_base64s(tensor):
     if tensor is None:
         return None
     images = tensor2images(tensor)
-    data_bytes_list = [encode_image(image) for image in images]
+    data_bytes_list = parallel_map(encode_image, images)
     return [decorate_base64(base64.b64encode(data_bytes).decode("utf-8"), format=format) for data_bytes, format in data_bytes_list]
     # return [base64.b64encode(encode_image(image)).decode("utf-8") for image in images]
 
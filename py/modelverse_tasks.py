@@ -0,0 +1,88 @@
+"""
+Submit variants of the video nodes and the generic Await Task node
+"""
+from .modelverse_api.client import ModelverseClient
+from .modelverse_api.polling import poll_task
+from .modelverse_api.task_handle import TASK_TYPE, submit_variant
+from comfy.comfy_types.node_typing import IO
+
+from . import (
+    doubao_seedance_2,
+    happyhorse_i2v,
+    happyhorse_r2v,
+    happyhorse_t2v,
+    kling_v3,
+    kling_v3_omni,
+    sora_i2v,
+    sora_t2v,
+    veo_3_1,
+    vidu_extend,
+    vidu_i2v,
+    vidu_ref2v,
+    vidu_startend2v,
+    vidu_t2v,
+    wan_ai_i2v,
+    wan_ai_t2v,
+)
+
+
+VIDEO_MODULES = [
+    doubao_seedance_2,
+    happyhorse_i2v,
+    happyhorse_r2v,
+    happyhorse_t2v,
+    kling_v3,
+    kling_v3_omni,
+    sora_i2v,
+    sora_t2v,
+    veo_3_1,
+    vidu_extend,
+    vidu_i2v,
+    vidu_ref2v,
+    vidu_startend2v,
+    vidu_t2v,
+    wan_ai_i2v,
+    wan_ai_t2v,
+]
+
+
+class AwaitTaskNode:
+    """
+    Wait for a task submitted by a Submit node and return its video URL.
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "task": (TASK_TYPE, {"tooltip": "Handle returned by a Submit node"}),
+            },
+        }
+
+    RETURN_TYPES = (IO.STRING, IO.STRING)
+    RETURN_NAMES = ("url", "task_id")
+    FUNCTION = "await_task"
+    CATEGORY = "UCLOUD_MODELVERSE"
+
+    def await_task(self, task):
+        mv_client = ModelverseClient.from_client(task["client"])
+        task_id = task["task_id"]
+        print(f"Awaiting task {task_id} ({task.get('model') or 'unknown model'})")
+        video_url = poll_task(mv_client, task_id, **task.get("poll_args", {}))
+        return (video_url, task_id)
+
+
+NODE_CLASS_MAPPINGS = {
+    "Modelverse_AwaitTask": AwaitTaskNode,
+}
+
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "Modelverse_AwaitTask": "Modelverse Await Task",
+}
+
+for module in VIDEO_MODULES:
+    for key, node_cls in module.NODE_CLASS_MAPPINGS.items():
+        display_name = module.NODE_DISPLAY_NAME_MAPPINGS.get(key, key)
+        NODE_CLASS_MAPPINGS[f"{key}_Submit"] = submit_variant(
+            node_cls, f"Submits a {display_name} task and returns its handle without waiting for it.")
+        NODE_DISPLAY_NAME_MAPPINGS[f"{key}_Submit"] = f"{display_name} (Submit)"
@@ -1,10 +1,19 @@
+import asyncio
+import io
 import os
-import json
 import configparser
 import torch
 import server
 from aiohttp import web
+from PIL import Image
 from comfy.comfy_types.node_typing import IO
+from .modelverse_api.asset_staging import LOCAL_ASSET_ROUTE, local_asset_path
+from .modelverse_api.callbacks import CALLBACK_ROUTE, callback_receiver
+from .modelverse_api.client import ModelverseClientHandle, get_shared_client
+from .modelverse_api.encoding import benchmark_encoders, classify_content
+from .modelverse_api.key_pool import STRATEGIES, get_key_pool, key_pool_usage
+from .modelverse_api.metrics import metrics
+from .modelverse_api.secrets_store import SecretsStore
 
 try:
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -24,19 +33,15 @@ except Exception as e:
 
 
 secrets_path = os.path.join(parent_dir, 'secrets.json')
+secrets_store = SecretsStore(secrets_path)
 
 
 def load_secrets():
-    if not os.path.exists(secrets_path):
-        with open(secrets_path, 'w') as secrets_file:
-            json.dump({}, secrets_file, indent=2)
-    with open(secrets_path) as secrets_file:
-        return json.load(secrets_file)
+    return secrets_store.all()
 
 
 def save_secrets(secrets):
-    with open(secrets_path, 'w') as secrets_file:
-        json.dump(secrets, secrets_file, indent=2)
+    secrets_store.replace(secrets)
 
 
 async def get_modelverse_secrets(_request):
@@ -54,20 +59,53 @@ async def set_modelverse_secret(request):
     if not key:
         return web.json_response({"error": "Key cannot be empty"}, status=400)
 
-    secrets = load_secrets()
-    secrets[key] = value
-    save_secrets(secrets)
+    secrets_store.set(key, value)
     return web.json_response({"ok": True})
 
 
 async def delete_modelverse_secret(request):
     key = request.match_info["key"]
-    secrets = load_secrets()
-    if key not in secrets:
+    if not secrets_store.delete(key):
         return web.json_response({"error": "Key not found"}, status=404)
+    return web.json_response({"ok": True})
+
+
+async def get_modelverse_key_usage(_request):
+    return web.json_response(key_pool_usage())
+
+
+async def get_modelverse_metrics(_request):
+    return web.json_response(metrics.snapshot())
+
+
+async def post_modelverse_encoder_benchmark(request):
+    """Encode time and bytes of every candidate format and quality for the image in the body."""
+    data = await request.read()
+    try:
+        img = Image.open(io.BytesIO(data))
+        img.load()
+    except Exception:
+        return web.json_response({"error": "Body is not a readable image"}, status=400)
+    results = await asyncio.to_thread(benchmark_encoders, img)
+    return web.json_response({"size": list(img.size), "content": classify_content(img), "results": results})
+
 
-    del secrets[key]
-    save_secrets(secrets)
+async def get_modelverse_asset(request):
+    path = local_asset_path(request.match_info["name"])
+    if path is None or not os.path.exists(path):
+        return web.json_response({"error": "Asset not found"}, status=404)
+    return web.FileResponse(path)
+
+
+async def post_modelverse_callback(request):
+    if not callback_receiver.check_token(request.query.get("token")):
+        return web.json_response({"error": "Invalid token"}, status=403)
+    try:
+        body = await request.json()
+    except ValueError:
+        return web.json_response({"error": "Invalid JSON"}, status=400)
+    if not callback_receiver.notify(body):
+        return web.json_response({"error": "No task_id in body"}, status=400)
     return web.json_response({"ok": True})
 
 
@@ -75,6 +113,11 @@ if not getattr(server.PromptServer.instance, "_modelverse_secrets_registered", F
     server.PromptServer.instance.routes.get("/modelverse-secrets")(get_modelverse_secrets)
     server.PromptServer.instance.routes.post("/modelverse-secrets")(set_modelverse_secret)
     server.PromptServer.instance.routes.delete("/modelverse-secrets/{key}")(delete_modelverse_secret)
+    server.PromptServer.instance.routes.get("/modelverse-key-usage")(get_modelverse_key_usage)
+    server.PromptServer.instance.routes.get("/modelverse-metrics")(get_modelverse_metrics)
+    server.PromptServer.instance.routes.post("/modelverse-encoder-benchmark")(post_modelverse_encoder_benchmark)
+    server.PromptServer.instance.routes.get(LOCAL_ASSET_ROUTE + "/{name}")(get_modelverse_asset)
+    server.PromptServer.instance.routes.post(CALLBACK_ROUTE)(post_modelverse_callback)
     server.PromptServer.instance._modelverse_secrets_registered = True
 
 
@@ -115,7 +158,7 @@ class ModelverseAPIClient:
             api_key: UCloud Modelverse API key
 
         Returns:
-            ModelVerseAPI: UCloud Modelverse API client
+            ModelverseClientHandle: {"api_key": ...} dict carrying the shared client for this key
         """
         modelverse_api_key = ""
         if api_key == "":
@@ -130,9 +173,7 @@ class ModelverseAPIClient:
         else:
             modelverse_api_key = api_key
 
-        return ({
-            "api_key": modelverse_api_key
-        },)
+        return (ModelverseClientHandle(get_shared_client(modelverse_api_key)),)
 
 
 class ModelverseSecretClient:
@@ -164,21 +205,83 @@ class ModelverseSecretClient:
 
     @classmethod
     def IS_CHANGED(cls, secret):
-        return load_secrets().get(secret, "")
+        return secrets_store.get(secret, "")
 
     def create_client(self, secret):
         secret = secret.strip() if isinstance(secret, str) else secret
         if not secret:
             raise ValueError("Secret name is required")
 
-        secrets = load_secrets()
-        api_key = secrets.get(secret)
+        api_key = secrets_store.get(secret)
         if not api_key:
             raise ValueError(f"Secret '{secret}' not found in secrets.json")
 
-        return ({
-            "api_key": api_key
-        },)
+        return (ModelverseClientHandle(get_shared_client(api_key)),)
+
+
+def parse_secret_names(secrets):
+    names = []
+    for line in (secrets or "").replace(",", "\n").split("\n"):
+        name = line.strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+class ModelverseSecretPoolClient:
+    """
+    UCloud Modelverse API Client backed by several locally managed secrets.
+
+    Requests are spread across the keys by in-flight count or remaining rate
+    budget. Keys rejected with 401 or quota errors are quarantined for a while,
+    and per-key usage is served at /modelverse-key-usage.
+    """
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "secrets": ("STRING", {
+                    "multiline": True,
+                    "default": "",
+                    "tooltip": "Secret names from Modelverse Secrets Manager, one per line or comma-separated."
+                }),
+                "strategy": (STRATEGIES, {
+                    "default": "least_in_flight",
+                    "tooltip": "least_in_flight: key with fewest running requests; rate_budget: key with most requests left this minute"
+                }),
+                "rate_limit": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 100000,
+                    "tooltip": "Requests per minute allowed per key (0 for unlimited)"
+                }),
+            },
+        }
+
+    RETURN_TYPES = ("MODELVERSE_API_CLIENT",)
+    RETURN_NAMES = ("client",)
+
+    FUNCTION = "create_client"
+
+    CATEGORY = "UCLOUD_MODELVERSE"
+
+    @classmethod
+    def IS_CHANGED(cls, secrets, strategy, rate_limit):
+        return "\n".join(secrets_store.get(name, "") for name in parse_secret_names(secrets))
+
+    def create_client(self, secrets, strategy="least_in_flight", rate_limit=0):
+        names = parse_secret_names(secrets)
+        if not names:
+            raise ValueError("At least one secret name is required")
+
+        stored = load_secrets()
+        missing = [name for name in names if not stored.get(name)]
+        if missing:
+            raise ValueError(f"Secret(s) {', '.join(missing)} not found in secrets.json")
+
+        key_pool = get_key_pool({name: stored[name] for name in names}, strategy, rate_limit)
+        return (ModelverseClientHandle(get_shared_client(stored[names[0]], key_pool=key_pool)),)
 
 
 class ModelverseImagePacker:
@@ -239,10 +342,12 @@ class ModelverseImagePacker:
 NODE_CLASS_MAPPINGS = {
     'UCloud ModelVerse Client': ModelverseAPIClient,
     'UCloud ModelVerse Secret Client': ModelverseSecretClient,
+    'UCloud ModelVerse Secret Pool Client': ModelverseSecretPoolClient,
     'ModelVerse Image Packer': ModelverseImagePacker
 }
 NODE_DISPLAY_NAME_MAPPINGS = {
     'UCloud ModelVerse Client': 'Modelverse Client',
     'UCloud ModelVerse Secret Client': 'Modelverse Secret Client',
+    'UCloud ModelVerse Secret Pool Client': 'Modelverse Secret Pool Client',
     'ModelVerse Image Packer': 'Modelverse Image Packer'
 }
@@ -230,7 +230,7 @@ class ModelverseChat:
             raise ValueError("No API key found in the client")
             
         # Create ModelverseClient instance to get the actual API key
-        modelverse_client = ModelverseClient(api_key)
+        modelverse_client = ModelverseClient.from_client(client)
         
         # Initialize OpenAI client with the API key from ModelverseClient
         openai_client = openai.OpenAI(api_key=modelverse_client.api_key,base_url="https://api.modelverse.cn/v1")
@@ -1,10 +1,10 @@
-import base64
-import torch
-from typing import Optional, List
+import asyncio
+from functools import partial
 from comfy.comfy_types.node_typing import IO
 
-from .modelverse_api.utils import imageurl2tensor, decode_image, images2tensor
+from .modelverse_api.utils import output_connected, request_seed, results2tensor
 from .modelverse_api.client import ModelverseClient
+from .modelverse_api.progress import ResultPreviewer
 from .modelverse_api.requests.qwen_image_edit import QwenImageEdit
 
 
@@ -29,6 +29,10 @@ class QwenImageEditNode:
                 "guidance_scale": (IO.FLOAT, {"default": 2.5, "min": 1.0, "max": 10.0, "step": 0.1, "display": "number"}),
                 "response_format": (["url", "b64_json"], {"default": "url"}),
             },
+            "hidden": {
+                "graph": "PROMPT",
+                "unique_id": "UNIQUE_ID",
+            },
         }
 
     RETURN_TYPES = (IO.IMAGE,)
@@ -50,6 +54,8 @@ class QwenImageEditNode:
         seed: int = -1,
         guidance_scale: float = 2.5,
         response_format: str = "url",
+        graph=None,
+        unique_id=None,
     ):
 
         if not prompt:
@@ -59,17 +65,17 @@ class QwenImageEditNode:
 
         print("INFO:", "Running Qwen/Qwen-Image-Edit.")
 
-        mv_client = ModelverseClient(client["api_key"])
+        mv_client = ModelverseClient.from_client(client)
 
         tasks = [
-            mv_client.async_send_request(
+            partial(mv_client.async_send_request,
                 QwenImageEdit(
                     prompt=prompt,
                     image=image,
                     negative_prompt=negative_prompt,
                     num_images=num_images,
                     strength=strength,
-                    seed=seed + i,
+                    seed=request_seed(seed, i),
                     steps=steps,
                     guidance_scale=guidance_scale,
                     response_format=response_format,
@@ -78,45 +84,12 @@ class QwenImageEditNode:
             for i in range(num_requests)
         ]
 
-        results = await mv_client.run_tasks(tasks)  # list of data lists
-
-        output_images_list: List[torch.Tensor] = []
-        for data_list in results:
-            if not data_list:
-                print("WARN:", "No output in current request. Skipping...")
-                continue
-
-            if response_format == "url":
-                output_images = imageurl2tensor(data_list)
-            else:
-                # b64_json path
-                images = []
-                for item in data_list:
-                    b64v = item.get("b64_json") or item.get("b64")
-                    if not b64v:
-                        continue
-                    if isinstance(b64v, str) and b64v.startswith("data:"):
-                        try:
-                            b64v = b64v.split(",", 1)[1]
-                        except Exception:
-                            pass
-                    try:
-                        img_bytes = base64.b64decode(b64v)
-                        pil_img = decode_image(img_bytes)
-                        images.append(pil_img)
-                    except Exception:
-                        continue
-                if not images:
-                    print("WARN:", "No decodable base64 image found.")
-                    continue
-                output_images = images2tensor(images)
-
-            output_images_list.append(output_images)
-
-        if not output_images_list:
-            return (torch.zeros((1, 3, 1, 1)),)
-
-        return (torch.cat(output_images_list, dim=0),)
+        # Each request's first image is previewed on the node as it completes
+        previews = ResultPreviewer(len(tasks), enabled=output_connected(graph, unique_id))
+        results = await mv_client.run_tasks(tasks, on_result=previews)  # list of data lists
+
+        # Decode every item of every request off the event loop, into one batch
+        return (await asyncio.to_thread(results2tensor, results),)
 
 
 NODE_CLASS_MAPPINGS = {
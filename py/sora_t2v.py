@@ -2,8 +2,8 @@
 OpenAI Sora2 Text2Video - 文生视频模型
 Models: openai/sora-2/text-to-video, openai/sora-2/text-to-video-pro
 """
-import time
 from .modelverse_api.client import ModelverseClient
+from .modelverse_api.polling import poll_task
 from comfy.comfy_types.node_typing import IO
 
 
@@ -47,7 +47,7 @@ class SoraText2VideoNode:
         if model == "openai/sora-2/text-to-video" and size not in SIZES:
             raise ValueError(f"普通版仅支持 {SIZES}，请使用 Pro 版获取更多分辨率选项")
 
-        mv_client = ModelverseClient(api_key)
+        mv_client = ModelverseClient.from_client(client)
 
         task_input = {"prompt": prompt}
         parameters = {
@@ -69,25 +69,7 @@ class SoraText2VideoNode:
         return (video_url, task_id)
 
     def _poll_task(self, mv_client, task_id, max_retries=180):
-        for i in range(max_retries):
-            status_res = mv_client.get_task_status(task_id)
-            task_status = status_res.get("output", {}).get("task_status")
-
-            if task_status == "Success":
-                urls = status_res.get("output", {}).get("urls", [])
-                if urls:
-                    return urls[0]
-                raise Exception("Task succeeded but no video URL returned")
-            elif task_status == "Failure":
-                error = status_res.get("output", {}).get("error_message", "Unknown error")
-                raise Exception(f"Task failed: {error}")
-            elif task_status in ["Pending", "Running"]:
-                print(f"Task {task_id}: {task_status} ({i+1}/{max_retries})")
-                time.sleep(5)
-            else:
-                raise Exception(f"Unknown status: {task_status}")
-
-        raise Exception("Task timed out")
+        return poll_task(mv_client, task_id, max_retries=max_retries)
 
 
 NODE_CLASS_MAPPINGS = {
@@ -1,4 +1,5 @@
-from .modelverse_api.utils import imageurl2tensor
+from functools import partial
+from .modelverse_api.utils import imageurl2tensor, request_seed
 from .modelverse_api.client import ModelverseClient
 from .modelverse_api.requests.step1x_edit import Step1xEdit
 import torch
@@ -77,15 +78,15 @@ class Step1xEditNode:
             raise ValueError("Input image is required")
         print("INFO:", "Running Step1X-Edit.")
 
-        client = ModelverseClient(client["api_key"])
+        client = ModelverseClient.from_client(client)
 
-        tasks = [client.async_send_request(Step1xEdit(
+        tasks = [partial(client.async_send_request, Step1xEdit(
             prompt=prompt,
             image=image,
             negative_prompt=negative_prompt,
             guidance_scale=guidance_scale,
             num_inference_steps=num_inference_steps,
-            seed=seed+i,
+            seed=request_seed(seed, i),
         ))
             for i in range(num_requests)]
 
@@ -3,9 +3,12 @@ Google Veo 3.1 video generation
 Models: veo-3.1-generate-001, veo-3.1-fast-generate-001
 """
 import base64
-import time
 from .modelverse_api.client import ModelverseClient
-from .modelverse_api.utils import decode_image, encode_image, fetch_image, tensor2images
+from .modelverse_api.polling import poll_task
+from .modelverse_api.input_limits import fit_to_model
+from .modelverse_api.http_cache import image_cache
+from .modelverse_api.encoding import passthrough_format, sniff_format
+from .modelverse_api.utils import encode_image, load_image, prepare_image
 from comfy.comfy_types.node_typing import IO
 
 
@@ -17,41 +20,58 @@ PERSON_GENERATIONS = ["dont_allow", "allow_adult"]
 
 
 def _bytes_to_veo_image(data_bytes, fmt):
-    mime = "image/png" if fmt == "PNG" else "image/jpeg"
+    mime = f"image/{fmt.lower()}"
     return {
         "bytesBase64Encoded": base64.b64encode(data_bytes).decode("utf-8"),
         "mimeType": mime,
     }
 
 
-def _tensor_to_veo_image(tensor):
-    data_bytes, fmt = encode_image(tensor2images(tensor)[0])
+def _tensor_to_veo_image(tensor, model):
+    data_bytes, fmt = encode_image(prepare_image(tensor, model), model=model)
     return _bytes_to_veo_image(data_bytes, fmt)
 
 
-def _url_to_veo_image(url, label):
+def _url_to_veo_image(url, label, model):
     url = url.strip()
     if url.startswith("data:image/") and "," in url:
         header, data = url.split(",", 1)
         mime = header.split(";")[0].replace("data:", "")
+        try:
+            fmt = sniff_format(base64.b64decode(data[:16]))
+        except ValueError:
+            fmt = None
+        if fmt is not None:
+            mime = f"image/{fmt.lower()}"
         return {"bytesBase64Encoded": data, "mimeType": mime}
     if url.startswith(("http://", "https://")):
-        image_data = fetch_image(url)
-        img = decode_image(image_data)
-        data_bytes, fmt = encode_image(img)
-        return _bytes_to_veo_image(data_bytes, fmt)
+        # Revalidated on every run; an unchanged frame is not fetched or encoded again
+        return dict(image_cache.decoded(url, ("veo", model), lambda data, content_type:
+                                        _fetched_to_veo_image(url, data, content_type, model)))
     raise ValueError(f"{label}: URL must be http(s) or a data:image/...;base64,... value")
 
 
-def _resolve_veo_image(image, url, label):
+def _fetched_to_veo_image(url, image_data, content_type, model):
+    # JPEG/PNG within the model's limits, served with a matching Content-Type,
+    # is forwarded as is, without a decode and re-encode
+    fmt = passthrough_format(image_data, content_type, model)
+    if fmt is not None:
+        return _bytes_to_veo_image(image_data, fmt)
+    print("INFO:", f"Transcoding frame {url} ({content_type or 'unknown type'}, {len(image_data)} bytes) for {model}.")
+    img = fit_to_model(load_image(image_data), model)
+    data_bytes, fmt = encode_image(img, model=model)
+    return _bytes_to_veo_image(data_bytes, fmt)
+
+
+def _resolve_veo_image(image, url, label, model):
     has_url = url and url.strip()
     has_image = image is not None
     if has_url and has_image:
         raise ValueError(f"{label}: provide either image or url, not both")
     if has_url:
-        return _url_to_veo_image(url, label)
+        return _url_to_veo_image(url, label, model)
     if has_image:
-        return _tensor_to_veo_image(image)
+        return _tensor_to_veo_image(image, model)
     return None
 
 
@@ -147,12 +167,12 @@ class Veo31VideoNode:
         if not prompt or not prompt.strip():
             raise ValueError("prompt is required for Veo 3.1")
 
-        first_image = _resolve_veo_image(first_frame_image, first_frame_url, "First frame")
-        last_image = _resolve_veo_image(last_frame_image, last_frame_url, "Last frame")
+        first_image = _resolve_veo_image(first_frame_image, first_frame_url, "First frame", model)
+        last_image = _resolve_veo_image(last_frame_image, last_frame_url, "Last frame", model)
         if last_image and not first_image:
             raise ValueError("First frame is required when last frame is provided")
 
-        mv_client = ModelverseClient(api_key)
+        mv_client = ModelverseClient.from_client(client)
         task_input = {"prompt": prompt.strip()}
         if negative_prompt and negative_prompt.strip():
             task_input["negative_prompt"] = negative_prompt.strip()
@@ -181,25 +201,7 @@ class Veo31VideoNode:
         return (video_url, task_id)
 
     def _poll_task(self, mv_client, task_id, max_retries=180):
-        for i in range(max_retries):
-            status_res = mv_client.get_task_status(task_id)
-            task_status = status_res.get("output", {}).get("task_status")
-
-            if task_status == "Success":
-                urls = status_res.get("output", {}).get("urls", [])
-                if urls:
-                    return urls[0]
-                raise Exception("Task succeeded but no video URL returned")
-            if task_status == "Failure":
-                error = status_res.get("output", {}).get("error_message", "Unknown error")
-                raise Exception(f"Task failed: {error}")
-            if task_status in ["Pending", "Running"]:
-                print(f"Task {task_id}: {task_status} ({i + 1}/{max_retries})")
-                time.sleep(5)
-                continue
-            raise Exception(f"Unknown status: {task_status}")
-
-        raise Exception("Task timed out")
+        return poll_task(mv_client, task_id, max_retries=max_retries)
 
 
 NODE_CLASS_MAPPINGS = {
@@ -2,9 +2,9 @@
 Vidu Extend - 视频延长模型
 Models: viduq2-pro, viduq2-turbo
 """
-import time
 from .modelverse_api.client import ModelverseClient
-from .modelverse_api.utils import image_to_base64
+from .modelverse_api.polling import poll_task
+from .modelverse_api.utils import image_to_url
 from comfy.comfy_types.node_typing import IO
 
 
@@ -50,7 +50,7 @@ class ViduExtendNode:
         if not video_url or not video_url.strip():
             raise ValueError("必须提供 video_url")
 
-        mv_client = ModelverseClient(api_key)
+        mv_client = ModelverseClient.from_client(client)
 
         task_input = {
             "video_url": video_url.strip(),
@@ -65,7 +65,7 @@ class ViduExtendNode:
         if has_last_url:
             task_input["last_frame_url"] = last_frame_url.strip()
         elif has_last_image:
-            task_input["last_frame_url"] = image_to_base64(last_frame_image)
+            task_input["last_frame_url"] = image_to_url(last_frame_image, model)
 
         if prompt and prompt.strip():
             task_input["prompt"] = prompt.strip()
@@ -90,25 +90,7 @@ class ViduExtendNode:
         return (video_url_result, task_id)
 
     def _poll_task(self, mv_client, task_id, max_retries=180):
-        for i in range(max_retries):
-            status_res = mv_client.get_task_status(task_id)
-            task_status = status_res.get("output", {}).get("task_status")
-
-            if task_status == "Success":
-                urls = status_res.get("output", {}).get("urls", [])
-                if urls:
-                    return urls[0]
-                raise Exception("Task succeeded but no video URL returned")
-            elif task_status == "Failure":
-                error = status_res.get("output", {}).get("error_message", "Unknown error")
-                raise Exception(f"Task failed: {error}")
-            elif task_status in ["Pending", "Running"]:
-                print(f"Task {task_id}: {task_status} ({i+1}/{max_retries})")
-                time.sleep(5)
-            else:
-                raise Exception(f"Unknown status: {task_status}")
-
-        raise Exception("Task timed out")
+        return poll_task(mv_client, task_id, max_retries=max_retries)
 
 
 NODE_CLASS_MAPPINGS = {
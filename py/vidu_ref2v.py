@@ -3,9 +3,9 @@ Vidu Reference2Video - 参考生视频模型
 Models: viduq3-turbo, viduq2
 支持1-7张参考图片，生成具备主体一致的视频
 """
-import time
 from .modelverse_api.client import ModelverseClient
-from .modelverse_api.utils import image_to_base64
+from .modelverse_api.polling import poll_task
+from .modelverse_api.utils import image_to_url
 from comfy.comfy_types.node_typing import IO
 
 
@@ -59,13 +59,13 @@ class ViduReference2VideoNode:
         if not api_key:
             raise ValueError("API key is not set")
 
-        mv_client = ModelverseClient(api_key)
+        mv_client = ModelverseClient.from_client(client)
 
         # Collect images
         images = []
         for img in [image1, image2, image3, image4, image5, image6, image7]:
             if img is not None:
-                images.append(image_to_base64(img))
+                images.append(image_to_url(img, model))
 
         # Add URL images
         if image_urls and image_urls.strip():
@@ -108,25 +108,7 @@ class ViduReference2VideoNode:
         return (video_url, task_id)
 
     def _poll_task(self, mv_client, task_id, max_retries=180):
-        for i in range(max_retries):
-            status_res = mv_client.get_task_status(task_id)
-            task_status = status_res.get("output", {}).get("task_status")
-
-            if task_status == "Success":
-                urls = status_res.get("output", {}).get("urls", [])
-                if urls:
-                    return urls[0]
-                raise Exception("Task succeeded but no video URL returned")
-            elif task_status == "Failure":
-                error = status_res.get("output", {}).get("error_message", "Unknown error")
-                raise Exception(f"Task failed: {error}")
-            elif task_status in ["Pending", "Running"]:
-                print(f"Task {task_id}: {task_status} ({i+1}/{max_retries})")
-                time.sleep(5)
-            else:
-                raise Exception(f"Unknown status: {task_status}")
-
-        raise Exception("Task timed out")
+        return poll_task(mv_client, task_id, max_retries=max_retries)
 
 
 NODE_CLASS_MAPPINGS = {
@@ -1,6 +1,6 @@
-import time
 from .modelverse_api.client import ModelverseClient
-from .modelverse_api.utils import image_to_base64
+from .modelverse_api.polling import poll_task
+from .modelverse_api.utils import image_to_url
 from comfy.comfy_types.node_typing import IO
 
 
@@ -36,7 +36,7 @@ class Modelverse_WanAII2V:
         if not api_key:
             raise ValueError("API key is not set in the client")
             
-        mv_client = ModelverseClient(api_key)
+        mv_client = ModelverseClient.from_client(client)
 
         # Prepare the input data
         task_input = {"prompt": prompt}
@@ -55,23 +55,23 @@ class Modelverse_WanAII2V:
             task_input["first_frame_url"] = first_frame_url.strip()
             print(f"Using first frame URL: {first_frame_url}")
         else:
-            # Convert IMAGE tensor to base64
-            first_frame_base64 = image_to_base64(first_frame_image)
+            # Convert IMAGE tensor to a staged URL or base64
+            first_frame_base64 = image_to_url(first_frame_image, "Wan-AI/Wan2.2-I2V")
             if not first_frame_base64:
                 raise ValueError("Failed to convert first frame image to base64")
             task_input["first_frame_url"] = first_frame_base64
-            print("Using first frame from IMAGE input (converted to base64)")
+            print("Using first frame from IMAGE input")
 
         # Handle last frame (optional)
         if last_frame_url and last_frame_url.strip():
             task_input["last_frame_url"] = last_frame_url.strip()
             print(f"Using last frame URL: {last_frame_url}")
         elif last_frame_image is not None:
-            # Convert IMAGE tensor to base64
-            last_frame_base64 = image_to_base64(last_frame_image)
+            # Convert IMAGE tensor to a staged URL or base64
+            last_frame_base64 = image_to_url(last_frame_image, "Wan-AI/Wan2.2-I2V")
             if last_frame_base64:
                 task_input["last_frame_url"] = last_frame_base64
-                print("Using last frame from IMAGE input (converted to base64)")
+                print("Using last frame from IMAGE input")
 
         # Add negative prompt if provided
         if negative_prompt and negative_prompt.strip():
@@ -95,48 +95,16 @@ class Modelverse_WanAII2V:
 
         print(f"Task submitted successfully with ID: {task_id}")
 
-        # 2. Poll for the result
-        video_url = ""
-        max_retries = 120  # Maximum 10 minutes (120 * 5 seconds)
-        retry_count = 0
-        
-        while True:
-            try:
-                status_res = mv_client.get_task_status(task_id)
-                task_status = status_res.get("output", {}).get("task_status")
-
-                if task_status == "Success":
-                    urls = status_res.get("output", {}).get("urls", [])
-                    if urls and len(urls) > 0:
-                        video_url = urls[0]
-                        print(f"Task completed successfully! Video URL: {video_url}")
-                        break
-                    else:
-                        raise Exception("Task succeeded but no video URL was returned.")
-                        
-                elif task_status == "Failure":
-                    error_message = status_res.get("output", {}).get("error_message", "Unknown error")
-                    raise Exception(f"Task failed: {error_message}")
-                    
-                elif task_status in ["Pending", "Running"]:
-                    print(f"Task {task_id} is {task_status}, waiting... ({retry_count + 1}/{max_retries})")
-                    time.sleep(5)  # Wait for 5 seconds before polling again
-                    retry_count += 1
-                else:
-                    raise Exception(f"Unknown task status: {task_status}")
-                    
-            except Exception as e:
-                if "Task failed" in str(e) or "Unknown task status" in str(e):
-                    raise e
-                print(f"Error checking task status: {e}, retrying...")
-                retry_count += 1
-                time.sleep(5)
-        
-        if not video_url:
-            raise Exception(f"Task timed out after {max_retries * 5} seconds")
+        # 2. Poll for the result, riding out transient status errors
+        video_url = self._poll_task(mv_client, task_id, max_retries=120, retry_errors=True)  # 10 minutes
 
         return (video_url, task_id)
 
+    def _poll_task(self, mv_client, task_id, max_retries=180, retry_errors=False):
+        video_url = poll_task(mv_client, task_id, max_retries=max_retries, retry_errors=retry_errors)
+        print(f"Task completed successfully! Video URL: {video_url}")
+        return video_url
+
 
 NODE_CLASS_MAPPINGS = {
     "Modelverse_WanAII2V": Modelverse_WanAII2V
@@ -1,5 +1,5 @@
-import time
 from .modelverse_api.client import ModelverseClient
+from .modelverse_api.polling import poll_task
 from comfy.comfy_types.node_typing import IO
 
 
@@ -30,7 +30,7 @@ class Modelverse_WanAIT2V:
         if not api_key:
             raise ValueError("API key is not set in the client")
             
-        mv_client = ModelverseClient(api_key)
+        mv_client = ModelverseClient.from_client(client)
 
         task_input = {"prompt": prompt}
         if negative_prompt:
@@ -50,27 +50,13 @@ class Modelverse_WanAIT2V:
             raise Exception(f"Failed to submit task: {submit_res.get('request_id')}")
 
         # 2. Poll for the result
-        video_url = ""
-        while True:
-            status_res = mv_client.get_task_status(task_id)
-            task_status = status_res.get("output", {}).get("task_status")
-
-            if task_status == "Success":
-                video_url = status_res.get("output", {}).get("urls", [None])[0]
-                if not video_url:
-                    raise Exception("Task succeeded but no video URL was returned.")
-                break
-            elif task_status == "Failure":
-                error_message = status_res.get("output", {}).get("error_message", "Unknown error")
-                raise Exception(f"Task failed: {error_message}")
-            elif task_status in ["Pending", "Running"]:
-                print(f"Task {task_id} is {task_status}, waiting...")
-                time.sleep(5)  # Wait for 5 seconds before polling again
-            else:
-                raise Exception(f"Unknown task status: {task_status}")
+        video_url = self._poll_task(mv_client, task_id)
 
         return (video_url, task_id)
 
+    def _poll_task(self, mv_client, task_id, max_retries=180):
+        return poll_task(mv_client, task_id, max_retries=max_retries)
+
 
 NODE_CLASS_MAPPINGS = {
     "Modelverse_WanAIT2V": Modelverse_WanAIT2V
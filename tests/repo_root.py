@@ -0,0 +1,17 @@
+"""
+pytest plugin. The repository root is a ComfyUI custom node package whose
+__init__ imports every node, and with it ComfyUI; collect the root as a plain
+directory so the library tests run without a ComfyUI install.
+"""
+import pathlib
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collect_directory(path, parent):
+    if path == ROOT:
+        return pytest.Dir.from_parent(parent, path=path)
+    return None
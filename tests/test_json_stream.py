@@ -0,0 +1,115 @@
+"""
+InlineDataParser against json.loads: real-shaped Gemini bodies, split into
+random chunks, must parse to the same structure with every inlineData.data
+string base64-decoded.
+"""
+import base64
+import io
+import json
+import os
+import random
+
+import pytest
+
+from modelverse_api.json_stream import InlineDataParser, parse_inline_data
+
+
+BLOB_PLACEHOLDER = '"@@blob@@"'
+IMAGES = [os.urandom(n) for n in (0, 1, 2, 3, 257, 3000)] + [bytes(range(256)) * 8]
+
+
+def gemini_body(images, escape_slashes=False, line_length=None, data_first=True) -> bytes:
+    """A generateContent response shaped like the API's, with decoy "data" keys outside inlineData."""
+    parts = [{"text": 'Here are your images: "quoted", a \\ backslash and ünïcode ✓'}]
+    for _ in images:
+        inline = {"mimeType": "image/png"}
+        inline = {"data": "@@blob@@", **inline} if data_first else {**inline, "data": "@@blob@@"}
+        parts.append({"inlineData": inline, "metadata": {"data": "not a blob", "inlineData": 1}})
+    text = json.dumps({
+        "candidates": [{"content": {"role": "model", "parts": parts}, "finishReason": "STOP"}],
+        "data": "top-level decoy",
+        "usageMetadata": {"promptTokenCount": 12, "candidatesTokenCount": 1290},
+    }, ensure_ascii=False, indent=1)
+    for data in images:
+        encoded = base64.b64encode(data).decode("ascii")
+        if line_length:
+            # Line-wrapped base64, as some encoders emit it
+            encoded = "\n".join(encoded[i:i + line_length] for i in range(0, len(encoded), line_length))
+        encoded = json.dumps(encoded)
+        if escape_slashes:
+            encoded = encoded.replace("/", "\\/")
+        text = text.replace(BLOB_PLACEHOLDER, encoded, 1)
+    return text.encode("utf-8")
+
+
+def expected(body: bytes):
+    """json.loads, with every inlineData.data base64-decoded."""
+    def walk(obj, parent_key=None):
+        if isinstance(obj, dict):
+            return {k: base64.b64decode(v.replace("\n", "")) if parent_key == "inlineData" and k == "data"
+                    else walk(v, k) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [walk(v) for v in obj]
+        return obj
+    return walk(json.loads(body))
+
+
+def materialize(obj):
+    """Parser result with its BytesIO buffers read out."""
+    if isinstance(obj, io.BytesIO):
+        return obj.getvalue()
+    if isinstance(obj, dict):
+        return {k: materialize(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [materialize(v) for v in obj]
+    return obj
+
+
+def random_chunks(body: bytes, rng: random.Random, max_size: int):
+    pos = 0
+    while pos < len(body):
+        size = rng.randint(1, max_size)
+        yield body[pos:pos + size]
+        pos += size
+
+
+@pytest.mark.parametrize("escape_slashes", [False, True])
+@pytest.mark.parametrize("line_length", [None, 76])
+@pytest.mark.parametrize("data_first", [True, False])
+def test_random_chunk_splits_match_json_loads(escape_slashes, line_length, data_first):
+    body = gemini_body(IMAGES, escape_slashes, line_length, data_first)
+    want = expected(body)
+    rng = random.Random(f"{escape_slashes}-{line_length}-{data_first}")
+    for max_size in (1, 2, 3, 5, 7, 64, 1000, len(body)):
+        for _ in range(5):
+            assert materialize(parse_inline_data(random_chunks(body, rng, max_size))) == want
+
+
+def test_every_split_point():
+    # Covers a chunk ending on the backslash of \/ or \n inside the base64
+    body = gemini_body([bytes(range(256))], escape_slashes=True, line_length=16)
+    want = expected(body)
+    for cut in range(len(body) + 1):
+        assert materialize(parse_inline_data([body[:cut], body[cut:]])) == want
+
+
+def test_blobs_replace_only_inline_data():
+    result = parse_inline_data([gemini_body([b"\x89PNG first", b"second"])])
+    parts = result["candidates"][0]["content"]["parts"]
+    assert [p["inlineData"]["data"].getvalue() for p in parts[1:]] == [b"\x89PNG first", b"second"]
+    assert parts[1]["metadata"]["data"] == "not a blob"
+    assert result["data"] == "top-level decoy"
+
+
+def test_body_without_inline_data_is_plain_json():
+    body = json.dumps({"error": {"code": 400, "message": 'bad "data": \\ here'}}).encode("utf-8")
+    assert parse_inline_data(random_chunks(body, random.Random(1), 3)) == json.loads(body)
+
+
+@pytest.mark.parametrize("cut_after", [b'"data": "', b"\\/", b'"text": "Here'])
+def test_truncated_body_raises(cut_after):
+    body = gemini_body([bytes(range(256)) * 2], escape_slashes=True)
+    parser = InlineDataParser()
+    parser.feed(body[:body.index(cut_after) + len(cut_after)])
+    with pytest.raises(ValueError):
+        parser.result()
@@ -0,0 +1,78 @@
+import { app } from "../../scripts/app.js";
+import { api } from "../../scripts/api.js";
+
+const EVENT = "modelverse.task_progress";
+const DONE_STATUSES = ["Success", "Failure", "Timeout"];
+// How long the final status stays on the node
+const CLEAR_AFTER_MS = 10000;
+
+const taskStates = new Map();
+
+function formatSeconds(seconds) {
+    const total = Math.max(0, Math.round(seconds ?? 0));
+    const minutes = Math.floor(total / 60);
+    return `${minutes}:${String(total % 60).padStart(2, "0")}`;
+}
+
+function describe(state) {
+    if (state.status === "Pending") {
+        const eta = state.eta_seconds != null ? ` · runs ~${formatSeconds(state.eta_seconds)}` : "";
+        return `Queued ${formatSeconds(state.queued_seconds)}${eta}`;
+    }
+    if (state.status === "Running") {
+        const percent = state.progress != null ? ` · ${Math.round(state.progress * 100)}%` : "";
+        const eta = state.eta_seconds != null ? ` · ETA ${formatSeconds(state.eta_seconds)}` : "";
+        return `Running ${formatSeconds(state.running_seconds)} (queued ${formatSeconds(state.queued_seconds)})${percent}${eta}`;
+    }
+    return `${state.status} · queued ${formatSeconds(state.queued_seconds)}, ran ${formatSeconds(state.running_seconds)}`;
+}
+
+function drawTaskState(node, ctx) {
+    const state = taskStates.get(String(node.id));
+    if (!state || node.flags?.collapsed) {
+        return;
+    }
+    ctx.save();
+    ctx.font = "12px sans-serif";
+    ctx.fillStyle = state.status === "Pending" ? "#e0b050" : state.status === "Failure" ? "#e06060" : "#8fd18f";
+    ctx.textAlign = "left";
+    ctx.fillText(describe(state), 6, node.size[1] + 14);
+    ctx.restore();
+}
+
+api.addEventListener(EVENT, ({ detail }) => {
+    if (detail?.node == null) {
+        return;
+    }
+    const key = String(detail.node);
+    taskStates.set(key, detail);
+    if (DONE_STATUSES.includes(detail.status)) {
+        setTimeout(() => {
+            if (taskStates.get(key) === detail) {
+                taskStates.delete(key);
+                app.graph?.setDirtyCanvas?.(true, false);
+            }
+        }, CLEAR_AFTER_MS);
+    }
+    app.graph?.setDirtyCanvas?.(true, false);
+});
+
+// A cancelled or new run leaves nothing to show
+for (const event of ["execution_start", "execution_interrupted"]) {
+    api.addEventListener(event, () => {
+        taskStates.clear();
+        app.graph?.setDirtyCanvas?.(true, false);
+    });
+}
+
+app.registerExtension({
+    name: "compshare.modelverse_progress",
+    nodeCreated(node) {
+        const onDrawForeground = node.onDrawForeground;
+        node.onDrawForeground = function (ctx) {
+            const result = onDrawForeground?.apply(this, arguments);
+            drawTaskState(this, ctx);
+            return result;
+        };
+    },
+});